@@ -0,0 +1,128 @@
+"""
+Аутентификация JWT с кэшем пользователей.
+
+JWTAuthentication на каждый запрос читает пользователя из базы по id из
+токена. CachedJWTAuthentication держит прочитанного пользователя в кэше
+JWT_USER_CACHE на JWT_USER_CACHE_TIMEOUT секунд. Сохранение или удаление
+пользователя после коммита удаляет его из кэша, так что смена роли через
+API или админку видна сразу. Изменения в обход сигналов (update(),
+bulk_update) применяются не позже истечения TTL.
+
+Кэш удаляется только в процессе, который сохранил пользователя, поэтому
+при нескольких процессах JWT_USER_CACHE должен быть общим (Redis,
+Memcached); с локальным кэшем другой процесс видит старую роль до
+истечения TTL. Запросы, изменяющие данные, всегда читают пользователя
+из базы: устаревший объект из кэша не должен попасть в save().
+
+VerifiedTokenJWTAuthentication дополнительно хранит в памяти процесса
+проверенные токены: ограниченный LRU-кэш «SHA-256 токена -> токен с
+claims» до истечения exp токена. Повторный запрос с тем же токеном не
+декодирует его и не проверяет подпись. Включается настройкой
+JWT_AUTHENTICATION=lru.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from users.models import User
+
+JWT_USER_CACHE = "default"
+
+
+def user_key(user_id):
+    return f"jwt-user:{user_id}"
+
+
+def get_cache():
+    return caches[JWT_USER_CACHE]
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        # Экземпляр создаётся на каждый запрос, поэтому метод запроса
+        # можно хранить в нём.
+        self.use_cache = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Токен не содержит идентификатора пользователя."
+            )
+        cache = get_cache()
+        key = user_key(user_id)
+        user = cache.get(key) if getattr(self, "use_cache", True) else None
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+        elif not user.is_active:
+            raise AuthenticationFailed(
+                "Пользователь неактивен.", code="user_inactive"
+            )
+        return user
+
+
+class VerifiedTokenCache:
+    """Потокобезопасный LRU-кэш проверенных токенов с учётом exp."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, digest):
+        with self.lock:
+            entry = self.tokens.get(digest)
+            if entry is None:
+                return None
+            token, expires = entry
+            if expires <= time.time():
+                del self.tokens[digest]
+                return None
+            self.tokens.move_to_end(digest)
+            return token
+
+    def set(self, digest, token):
+        with self.lock:
+            self.tokens[digest] = (token, token["exp"])
+            self.tokens.move_to_end(digest)
+            while len(self.tokens) > self.max_size:
+                self.tokens.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+
+
+verified_tokens = VerifiedTokenCache(settings.JWT_TOKEN_CACHE_SIZE)
+
+
+class VerifiedTokenJWTAuthentication(CachedJWTAuthentication):
+    def get_validated_token(self, raw_token):
+        digest = hashlib.sha256(raw_token).digest()
+        token = verified_tokens.get(digest)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            verified_tokens.set(digest, token)
+        return token
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, using, **kwargs):
+    key = user_key(getattr(instance, api_settings.USER_ID_FIELD))
+    transaction.on_commit(lambda: get_cache().delete(key), using=using)
@@ -0,0 +1,91 @@
+"""
+Версионированный кэш ответов каталога.
+
+Каждой модели каталога соответствует счётчик версии в кэше CATALOG_CACHE.
+Сохранение или удаление объекта после коммита транзакции поднимает версию
+модели, а версии всех моделей, от которых зависит ответ, входят в ключ
+кэша. Устаревшие записи не удаляются явно: их больше никто не запрашивает,
+и они вытесняются по TTL или MAX_ENTRIES бэкенда.
+
+Версия — время последнего изменения в наносекундах. Если счётчик был
+вытеснен из кэша, он создаётся заново с текущим временем, что лишь
+сбрасывает кэш модели. Обработчики сигналов подключены только к моделям
+VERSIONED_MODELS: у остальных моделей не отключается быстрое удаление
+queryset.delete() без загрузки объектов.
+
+Версию поднимает только процесс, изменивший объект. С локальным кэшем
+другие процессы отдают сохранённый ответ, пока он не истечёт по TTL
+CATALOG_CACHE_TIMEOUT; с общим кэшем (file, Redis) изменение видно сразу.
+ETag и Last-Modified от этих версий не зависят (см. ConditionalGetMixin).
+"""
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title)
+from users.models import User
+
+CATALOG_CACHE = "catalog"
+VERSIONED_MODELS = (Category, Comment, Genre, GenreTitle, Review, Title, User)
+
+
+def get_cache():
+    return caches[CATALOG_CACHE]
+
+
+def version_key(name):
+    return f"version:{name}"
+
+
+def get_versions(names):
+    """Возвращает версии моделей names в том же порядке."""
+    cache = get_cache()
+    keys = [version_key(name) for name in names]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def bump_version(name):
+    cache = get_cache()
+    key = version_key(name)
+    version = max(time.time_ns(), (cache.get(key) or 0) + 1)
+    cache.set(key, version, timeout=None)
+
+
+def fingerprint(request, versions):
+    """
+    Отпечаток ответа: хост, путь, параметры запроса, отсортированные по
+    имени (порядок значений одного параметра сохраняется), и версии.
+    """
+    params = sorted(request.query_params.lists(), key=lambda item: item[0])
+    raw = repr((request.get_host(), request.path, params, versions))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def catalog_changed(sender, using, **kwargs):
+    name = sender._meta.model_name
+    transaction.on_commit(lambda: bump_version(name), using=using)
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(catalog_changed, sender=model)
+    post_delete.connect(catalog_changed, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, using, **kwargs):
+    if action.startswith("post_"):
+        name = sender._meta.model_name
+        transaction.on_commit(lambda: bump_version(name), using=using)
@@ -0,0 +1,107 @@
+"""
+Поля сериализаторов для ссылок на справочники по slug.
+
+SlugRelatedField(many=True) ищет каждый slug отдельным запросом.
+CachedSlugRelatedField разрешает весь список одним запросом slug__in и
+сообщает сразу обо всех неизвестных slug. Найденные объекты хранятся в
+памяти процесса не дольше SLUG_CACHE_TIMEOUT секунд и под версией модели
+из кэша каталога: изменение или удаление записи справочника в этом
+процессе сразу начинает словарь заново, а изменения из других процессов
+видны не позже истечения TTL (сразу, если кэш каталога общий).
+Неизвестные slug не запоминаются — только что созданная запись найдётся
+в базе.
+
+Если запись удалена другим процессом до истечения TTL, запись со
+ссылкой на неё не пройдёт проверку внешнего ключа: тогда словарь
+сбрасывается функцией forget().
+
+Объекты из словаря общие для всех запросов и не должны изменяться.
+"""
+import time
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+from api import cache
+
+MAX_CACHED_SLUGS = 1000
+
+_resolved = {}
+
+
+def forget():
+    """Сбрасывает словари всех полей."""
+    _resolved.clear()
+
+
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    SlugRelatedField с разрешением списка slug одним запросом. queryset
+    должен содержать всю таблицу справочника: словарь общий для всех
+    полей с той же моделью и slug_field.
+    """
+
+    default_error_messages = {
+        "does_not_exist_many": "Не найдены объекты со slug: {slugs}.",
+    }
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ManySlugRelatedField(**list_kwargs)
+
+    def to_internal_value(self, data):
+        return self.resolve([data])[0]
+
+    def resolve(self, data):
+        """Объекты для списка slug data в том же порядке."""
+        for slug in data:
+            if not isinstance(slug, str):
+                self.fail("invalid")
+        queryset = self.get_queryset()
+        model = queryset.model
+        (version,) = cache.get_versions([model._meta.model_name])
+        key = (model._meta.label, self.slug_field)
+        now = time.monotonic()
+        cached_version, expires, objects = _resolved.get(key, (None, 0, {}))
+        if cached_version != version or expires <= now:
+            objects = {}
+            expires = now + settings.SLUG_CACHE_TIMEOUT
+        missing = set(data) - objects.keys()
+        if missing:
+            found = {
+                getattr(obj, self.slug_field): obj
+                for obj in queryset.filter(
+                    **{f"{self.slug_field}__in": missing}
+                )
+            }
+            unknown = missing - found.keys()
+            if unknown:
+                if len(data) == 1:
+                    self.fail(
+                        "does_not_exist",
+                        slug_name=self.slug_field,
+                        value=data[0],
+                    )
+                self.fail(
+                    "does_not_exist_many", slugs=", ".join(sorted(unknown))
+                )
+            objects = {**objects, **found}
+            if len(objects) <= MAX_CACHED_SLUGS:
+                _resolved[key] = (version, expires, objects)
+        return [objects[slug] for slug in data]
+
+
+class ManySlugRelatedField(ManyRelatedField):
+    """Список CachedSlugRelatedField, разрешаемый одним запросом."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        return self.child_relation.resolve(list(data))
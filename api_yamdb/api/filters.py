@@ -1,20 +1,28 @@
-from django_filters import CharFilter, ChoiceFilter, FilterSet
+from django import forms
+from django_filters import CharFilter, FilterSet, NumberFilter
 
-from api_yamdb import constances
 from reviews.models import Title
+from reviews.search import search_titles
+
+
+class YearFilter(NumberFilter):
+    """Целый год: проверяется как число, без списка допустимых значений."""
+
+    field_class = forms.IntegerField
 
 
 class TitleFilter(FilterSet):
     category = CharFilter(field_name="category__slug", lookup_expr="iexact")
     genre = CharFilter(field_name="genre__slug", lookup_expr="iexact")
-    name = CharFilter(field_name="name", lookup_expr="icontains")
-    year = ChoiceFilter(
-        field_name="year",
-        choices=[
-            (y, y) for y in range(constances.MINYEAR, constances.CURRENTYEAR)
-        ],
-    )
+    name = CharFilter(method="filter_name")
+    year = YearFilter(field_name="year")
+    year_min = YearFilter(field_name="year", lookup_expr="gte")
+    year_max = YearFilter(field_name="year", lookup_expr="lte")
 
     class Meta:
         model = Title
         fields = "__all__"
+        exclude = ("genre_list", "updated_at")
+
+    def filter_name(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -1,9 +1,192 @@
+from django.db.models import Count, Max
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import filters, mixins, viewsets, serializers
+from rest_framework.response import Response
 
+from api import cache
 from api.permissions import IsAdminOrReadOnly
 
 
+class CatalogVersionsMixin:
+    """Версии моделей из cache_dependencies, прочитанные раз за запрос."""
+
+    cache_dependencies = ()
+
+    def get_catalog_versions(self):
+        if not hasattr(self, "_catalog_versions"):
+            self._catalog_versions = cache.get_versions(
+                self.cache_dependencies
+            )
+        return self._catalog_versions
+
+
+class NestedResourceMixin:
+    """
+    Родительский объект вложенного маршрута. Вся цепочка ключей из URL
+    проверяется одним запросом: parent_lookups сопоставляет поля модели
+    parent_model именам из kwargs. Объект читается раз за запрос и
+    только с полями из parent_lookups. parent_field — внешний ключ
+    дочерней модели на родителя, children — related_name в обратную
+    сторону.
+    """
+
+    parent_model = None
+    parent_lookups = {}
+    parent_field = None
+    children = None
+
+    def get_parent_filter(self):
+        return {
+            field: self.kwargs.get(kwarg)
+            for field, kwarg in self.parent_lookups.items()
+        }
+
+    def get_parent(self):
+        if not hasattr(self, "_parent"):
+            self._parent = get_object_or_404(
+                self.parent_model.objects.only(*self.parent_lookups),
+                **self.get_parent_filter(),
+            )
+        return self._parent
+
+    def get_list_validators(self):
+        # Родитель и сводка по дочерним строкам — одним запросом; без
+        # родителя строки нет, и запрос получит 404. Найденная строка
+        # заменяет get_parent(): цепочка ключей уже проверена.
+        row = (
+            self.parent_model.objects.filter(**self.get_parent_filter())
+            .order_by()
+            .values("pk")
+            .annotate(
+                count=Count(self.children),
+                last=Max(f"{self.children}__updated_at"),
+            )
+            .values_list("pk", "count", "last")
+            .first()
+        )
+        if row is None:
+            return None
+        pk, count, last = row
+        self._parent = self.parent_model(pk=pk)
+        return count, last
+
+    def get_object_queryset(self):
+        # Без get_queryset(): тот читает родителя отдельным запросом.
+        child_model = self.parent_model._meta.get_field(
+            self.children
+        ).related_model
+        return child_model.objects.filter(
+            **{
+                f"{self.parent_field}__{field}": value
+                for field, value in self.get_parent_filter().items()
+            }
+        )
+
+
+class CachedListMixin(CatalogVersionsMixin):
+    """
+    Кэширует ответы list для анонимных пользователей.
+    Ключ зависит от версий моделей из cache_dependencies.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        key = "response:" + cache.fingerprint(
+            request, self.get_catalog_versions()
+        )
+        data = cache.get_cache().get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.get_cache().set(key, response.data)
+        return response
+
+
+class CachedReadMixin(CachedListMixin):
+    """Кэширует ответы list и retrieve для анонимных пользователей."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """
+    Отдаёт ETag и Last-Modified для list/retrieve и отвечает 304 на
+    If-None-Match/If-Modified-Since без сериализации. Валидаторы берутся
+    из данных одним лёгким запросом: для списка — число строк и
+    наибольшее updated_at, для объекта — его updated_at. Поэтому ответ
+    одинаков во всех процессах и меняется, только когда меняются строки
+    ресурса. Смена username автора в валидаторы не входит.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_list_validators, super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_object_validators,
+            super().retrieve,
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def get_list_validators(self):
+        """(число строк, наибольшее updated_at) отфильтрованного списка."""
+        summary = (
+            self.filter_queryset(self.get_queryset())
+            .order_by()
+            .aggregate(count=Count("pk"), last=Max("updated_at"))
+        )
+        return summary["count"], summary["last"]
+
+    def get_object_queryset(self):
+        return self.get_queryset()
+
+    def get_object_validators(self):
+        """(updated_at,) объекта или None, если его нет."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return (
+            self.get_object_queryset()
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list("updated_at")
+            .first()
+        )
+
+    def conditional_response(
+        self, get_validators, handler, request, *args, **kwargs
+    ):
+        validators = get_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        etag = '"{}"'.format(cache.fingerprint(request, validators))
+        last = validators[-1]
+        last_modified = int(last.timestamp()) if last else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
 class ListCreateDelMixin(
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
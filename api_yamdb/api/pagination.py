@@ -0,0 +1,178 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (keyset): вместо OFFSET страница выбирается
+    условием «после/до граничной записи», поэтому глубокие страницы
+    стоят столько же, сколько первая.
+
+    Сортировка берётся из запроса (OrderingFilter) или из Meta.ordering
+    модели и всегда дополняется первичным ключом. Курсор непрозрачен для
+    клиента и хранит значения полей сортировки граничной записи.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    invalid_cursor_message = "Неверный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(queryset)
+        self.count = queryset.order_by().count()
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [(field, not desc) for field, desc in ordering]
+        queryset = queryset.order_by(
+            *[self.order_expression(queryset, *item) for item in ordering]
+        )
+        if position is not None:
+            try:
+                queryset = queryset.filter(
+                    self.after_position(queryset, ordering, position)
+                )
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        page = list(queryset[: self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[: self.limit]
+        if reverse:
+            page.reverse()
+
+        self.page = page
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = has_more if reverse else position is not None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if limit <= 0:
+            return self.page_size
+        return min(limit, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """Возвращает список пар (поле, по убыванию) с pk в конце."""
+        fields = [
+            field
+            for field in (
+                queryset.query.order_by or queryset.model._meta.ordering
+            )
+            if isinstance(field, str) and field != "?"
+        ]
+        ordering = [
+            (field.lstrip("-"), field.startswith("-")) for field in fields
+        ]
+        pk_names = {"pk", queryset.model._meta.pk.name}
+        if not any(field in pk_names for field, _ in ordering):
+            ordering.append(("pk", False))
+        return ordering
+
+    def is_nullable(self, queryset, field):
+        if field == "pk":
+            return False
+        try:
+            return queryset.model._meta.get_field(field).null
+        except FieldDoesNotExist:
+            return True
+
+    def order_expression(self, queryset, field, desc):
+        if not self.is_nullable(queryset, field):
+            return F(field).desc() if desc else F(field).asc()
+        if desc:
+            return F(field).desc(nulls_last=True)
+        return F(field).asc(nulls_first=True)
+
+    def after_position(self, queryset, ordering, position):
+        """
+        Условие «строго после позиции» для сортировки ordering.
+        NULL считается меньше любого значения, как в order_expression.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (field, desc), value in zip(ordering, position):
+            nullable = self.is_nullable(queryset, field)
+            if value is None:
+                after = (
+                    Q(pk__in=[]) if desc else Q(**{f"{field}__isnull": False})
+                )
+                same = Q(**{f"{field}__isnull": True})
+            else:
+                lookup = "lt" if desc else "gt"
+                after = Q(**{f"{field}__{lookup}": value})
+                if desc and nullable:
+                    after |= Q(**{f"{field}__isnull": True})
+                same = Q(**{field: value})
+            condition |= equal & after
+            equal &= same
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            position = cursor["p"]
+            reverse = bool(cursor["r"])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(
+            self.ordering
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, obj, reverse):
+        position = [getattr(obj, field) for field, _ in self.ordering]
+        cursor = json.dumps(
+            {"p": position, "r": int(reverse)},
+            cls=DjangoJSONEncoder,
+            separators=(",", ":"),
+        )
+        encoded = urlsafe_b64encode(cursor.encode("utf-8")).decode("ascii")
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
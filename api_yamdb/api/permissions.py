@@ -34,9 +34,11 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
         )
 
     def has_object_permission(self, request, view, obj):
+        # Сначала проверки, которым хватает запроса и закэшированного
+        # пользователя, затем сравнение id без загрузки автора объекта.
         return (
             request.method in permissions.SAFE_METHODS
-            or obj.author == request.user
-            or request.user.is_moderator
             or request.user.is_admin
+            or request.user.is_moderator
+            or obj.author_id == request.user.pk
         )
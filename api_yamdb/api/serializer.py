@@ -1,5 +1,12 @@
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
+from api import fields
+from api.fields import CachedSlugRelatedField
 from api_yamdb import constances
 from reviews.models import Category, Comment, Genre, Review, Title
 from reviews.validators import year_validator
@@ -27,22 +34,30 @@ class TitleShowSerializer(serializers.ModelSerializer):
     """Сериализатор для выдачи произведений"""
 
     category = CategorySerializer(read_only=True)
-    genre = GenreSerializer(read_only=True, many=True)
+    genre = serializers.JSONField(source="genre_list", read_only=True)
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = "__all__"
+        fields = (
+            "id",
+            "name",
+            "year",
+            "rating",
+            "description",
+            "genre",
+            "category",
+        )
         model = Title
 
 
 class TitleAddSerializer(serializers.ModelSerializer):
     """Сериализатор для добавления произведения"""
 
-    category = serializers.SlugRelatedField(
+    category = CachedSlugRelatedField(
         slug_field="slug",
         queryset=Category.objects.all(),
     )
-    genre = serializers.SlugRelatedField(
+    genre = CachedSlugRelatedField(
         slug_field="slug",
         queryset=Genre.objects.all(),
         many=True,
@@ -54,6 +69,8 @@ class TitleAddSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
     def to_representation(self, instance):
+        # Категория и жанры уже в памяти из проверенных данных, рейтинг —
+        # хранимое поле: ответ на запись не читает базу.
         return TitleShowSerializer(instance).data
 
     def validate_genre(self, value):
@@ -61,6 +78,47 @@ class TitleAddSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Требуется выбрать жанр")
         return value
 
+    def create(self, validated_data):
+        # Кэш каталога сбрасывается после коммита, когда у произведения
+        # уже есть жанры.
+        genres = validated_data.pop("genre")
+        validated_data["genre_list"] = Title.build_genre_list(genres)
+        with self.stale_references():
+            with transaction.atomic():
+                title = super().create(validated_data)
+                title.set_genres(genres, created=True)
+        return title
+
+    def update(self, instance, validated_data):
+        # Сохраняются только пришедшие поля: хранимые счётчики рейтинга
+        # могли измениться после чтения instance.
+        genres = validated_data.pop("genre", None)
+        update_fields = list(validated_data)
+        with self.stale_references():
+            with transaction.atomic():
+                if genres is not None:
+                    instance.set_genres(genres)
+                    update_fields.append("genre_list")
+                for field, value in validated_data.items():
+                    setattr(instance, field, value)
+                if update_fields:
+                    instance.save(update_fields=[*update_fields, "updated_at"])
+        return instance
+
+    @contextmanager
+    def stale_references(self):
+        """
+        Жанр или категория из кэша полей могли быть удалены другим
+        процессом: внешний ключ не проходит проверку при коммите.
+        """
+        try:
+            yield
+        except IntegrityError:
+            fields.forget()
+            raise serializers.ValidationError(
+                constances.STALE_REFERENCE_ERROR
+            )
+
 
 class SignUpSerializer(serializers.Serializer):
     username = serializers.CharField(
@@ -80,19 +138,57 @@ class SignUpSerializer(serializers.Serializer):
         fields = ("username", "email")
 
     def validate(self, data):
-        if User.objects.filter(
-            username=data["username"], email=data["email"]
-        ).exists():
-            return data
-        if (
-            User.objects.filter(username=data["username"]).exists()
-            or User.objects.filter(email=data["email"]).exists()
-        ):
+        """
+        Один запрос по уникальным индексам username и email: либо это
+        повторная регистрация того же пользователя, либо одно из полей
+        занято другим.
+        """
+        users = User.objects.filter(
+            Q(username=data["username"]) | Q(email=data["email"])
+        )[:2]
+        self.user = None
+        for user in users:
+            if (user.username, user.email) == (
+                data["username"],
+                data["email"],
+            ):
+                self.user = user
+                return data
+        if users:
             raise serializers.ValidationError(
                 "Пользователь с такими данными уже существует!"
             )
         return data
 
+    def create(self, validated_data):
+        """
+        Возвращает найденного при проверке пользователя или создаёт нового.
+        Если параллельная регистрация успела раньше, решают уникальные
+        ограничения базы.
+        """
+        if self.user is not None:
+            return self.user
+        try:
+            with transaction.atomic():
+                return User.objects.create(**validated_data)
+        except IntegrityError:
+            user = User.objects.filter(
+                Q(username=validated_data["username"])
+                | Q(email=validated_data["email"])
+            ).first()
+            if user is None:
+                raise
+        if (user.username, user.email) == (
+            validated_data["username"],
+            validated_data["email"],
+        ):
+            return user
+        raise serializers.ValidationError(
+            constances.EMAIL_TAKEN_ERROR
+            if user.email == validated_data["email"]
+            else constances.USERNAME_TAKEN_ERROR
+        )
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -120,20 +216,31 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only=True,
     )
 
-    def validate(self, data):
-        request = self.context["request"]
-        if request.method == "POST":
-            title_id = self.context["view"].kwargs["title_id"]
-            author = self.context["request"].user
-            if author.reviews.filter(title=title_id).exists():
-                raise serializers.ValidationError(
-                    "Запрещено добавлять второй отзыв."
-                )
-        return data
+    def create(self, validated_data):
+        """
+        Второй отзыв автора на произведение отсекает ограничение
+        unique_title_author, без предварительного запроса и без гонки
+        между параллельными POST.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=validated_data["author"], title=validated_data["title"]
+            ).exists():
+                raise
+            raise serializers.ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "Запрещено добавлять второй отзыв."
+                    ]
+                }
+            )
 
     class Meta:
         model = Review
-        fields = "__all__"
+        exclude = ("updated_at",)
         read_only_fields = ("title",)
 
 
@@ -0,0 +1,97 @@
+"""
+Ограничение частоты запросов к регистрации и получению токена.
+
+Частота "N/период" из DEFAULT_THROTTLE_RATES задаёт ведро на N запросов,
+которое пополняется со скоростью N за период: короткий всплеск до N
+запросов проходит, дальше — не чаще заданной частоты. Состояние ведра —
+пара (остаток, время) в кэше THROTTLE_CACHE, без внешнего сервиса:
+locmem держит вёдра в памяти процесса, file — общие для процессов одной
+машины (между процессами обновление не атомарно, и при гонке может
+пройти лишний запрос).
+
+IP клиента определяется по NUM_PROXIES из REST_FRAMEWORK: по умолчанию
+это REMOTE_ADDR, и подменой X-Forwarded-For нельзя получить новое ведро.
+"""
+import hashlib
+import threading
+from collections.abc import Mapping
+
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+THROTTLE_CACHE = "throttle"
+
+_lock = threading.Lock()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """Базовый класс: подклассы задают scope и get_cache_key."""
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def __init__(self):
+        self.cache = caches[THROTTLE_CACHE]
+        self.wait_seconds = None
+        super().__init__()
+
+    def get_rate(self):
+        # Частоты читаются при каждом создании, а не при импорте класса,
+        # поэтому override_settings применяется сразу.
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        capacity = self.num_requests
+        refill = self.num_requests / self.duration
+        with _lock:
+            now = self.timer()
+            tokens, updated = self.cache.get(self.key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            else:
+                self.wait_seconds = (1 - tokens) / refill
+            # Через duration секунд ведро снова полное, хранить дольше
+            # незачем.
+            self.cache.set(self.key, (tokens, now), self.duration)
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Запросы к регистрации и токену с одного IP."""
+
+    scope = "auth_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": self.get_ident(request),
+        }
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    """Запросы к регистрации и токену для одного username с любых IP."""
+
+    scope = "auth_username"
+
+    def get_cache_key(self, request, view):
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get("username")
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": hashlib.sha1(
+                username.casefold().encode("utf-8")
+            ).hexdigest(),
+        }
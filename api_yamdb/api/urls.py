@@ -2,7 +2,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from api.views import (APIGetToken, APISignup, CategoryViewSet, CommentViewSet,
-                       GenreViewSet, ReviewViewSet, TitleViewSet, UsersViewSet)
+                       ExportView, GenreViewSet, ReviewViewSet, TitleViewSet,
+                       UsersViewSet)
 
 routerv1 = DefaultRouter()
 
@@ -28,4 +29,9 @@ urlpatterns_auth = [
 urlpatterns = [
     path("v1/", include(routerv1.urls)),
     path("v1/auth/", include(urlpatterns_auth)),
+    path(
+        "v1/export/<slug:name>.<slug:output_format>",
+        ExportView.as_view(),
+        name="export",
+    ),
 ]
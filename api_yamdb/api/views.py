@@ -1,12 +1,10 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
@@ -14,15 +12,20 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from api.filters import TitleFilter
-from api.mixins import ListCreateDelMixin
+from api.mixins import (CachedReadMixin, ConditionalGetMixin,
+                        ListCreateDelMixin, NestedResourceMixin)
+from api.pagination import KeysetPagination
 from api.permissions import IsAdmin, IsAdminOrReadOnly, IsAuthorOrReadOnly
 from api.serializer import (CategorySerializer, CommentSerializer,
                             GenreSerializer, GetTokenSerializer,
                             ReviewSerializer, SignUpSerializer,
                             TitleAddSerializer, TitleShowSerializer,
                             UserEditSerializer, UserSerializer)
+from api.throttling import AuthIPThrottle, AuthUsernameThrottle
 from api_yamdb import constances
-from reviews.models import Category, Genre, Review, Title
+from reviews import exporter
+from reviews.models import Category, Comment, Genre, Review, Title
+from users import outbox
 from users.models import User
 
 
@@ -31,6 +34,7 @@ class CategoryViewSet(ListCreateDelMixin):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_dependencies = ("category",)
 
 
 class GenreViewSet(ListCreateDelMixin):
@@ -38,23 +42,29 @@ class GenreViewSet(ListCreateDelMixin):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_dependencies = ("genre",)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ConditionalGetMixin, CachedReadMixin, viewsets.ModelViewSet
+):
     """Вьюсет для произведений"""
 
-    queryset = (
-        Title.objects.select_related("category")
-        .prefetch_related("genre")
-        .annotate(rating=Avg("reviews__score"))
-    )
-    pagination_class = LimitOffsetPagination
+    queryset = Title.objects.select_related("category")
+    pagination_class = KeysetPagination
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (
         DjangoFilterBackend,
         filters.OrderingFilter,
     )
     ordering_fields = ("rating", "name", "year")
+    cache_dependencies = (
+        "title",
+        "genre",
+        "category",
+        "genretitle",
+        "review",
+    )
     filterset_class = TitleFilter
     filterset_fields = (
         "name",
@@ -69,36 +79,90 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleAddSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    NestedResourceMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """Вьюсет для отзывов"""
 
     permission_classes = (IsAuthorOrReadOnly,)
     serializer_class = ReviewSerializer
-
-    def get_title(self):
-        return get_object_or_404(Title, pk=self.kwargs.get("title_id"))
+    parent_model = Title
+    parent_lookups = {"id": "title_id"}
+    parent_field = "title"
+    children = "reviews"
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return (
+            Review.objects.filter(title=self.get_parent())
+            .select_related("author")
+            .only(
+                "id",
+                "title_id",
+                "text",
+                "score",
+                "pub_date",
+                "updated_at",
+                "author__username",
+            )
+        )
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        serializer.save(author=self.request.user, title=self.get_parent())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    NestedResourceMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """Вьюсет для комментариев"""
 
     permission_classes = (IsAuthorOrReadOnly,)
     serializer_class = CommentSerializer
-
-    def get_review(self):
-        return get_object_or_404(Review, pk=self.kwargs.get("review_id"))
+    parent_model = Review
+    parent_lookups = {"id": "review_id", "title_id": "title_id"}
+    parent_field = "review"
+    children = "comments"
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return (
+            Comment.objects.filter(review=self.get_parent())
+            .select_related("author")
+            .only(
+                "id",
+                "review_id",
+                "text",
+                "pub_date",
+                "updated_at",
+                "author__username",
+            )
+        )
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        serializer.save(author=self.request.user, review=self.get_parent())
+
+
+class ExportView(APIView):
+    """
+    Потоковая выгрузка каталога для администратора:
+    /export/<набор>.<csv|ndjson>, наборы — titles, genre_title, review,
+    comments.
+    """
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, name, output_format):
+        if (
+            name not in exporter.DATASETS
+            or output_format not in exporter.CONTENT_TYPES
+        ):
+            raise NotFound("Неизвестный набор данных или формат.")
+        response = StreamingHttpResponse(
+            exporter.export(name, output_format),
+            content_type=exporter.CONTENT_TYPES[output_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{name}.{output_format}"'
+        )
+        return response
 
 
 class APIGetToken(APIView):
@@ -112,6 +176,7 @@ class APIGetToken(APIView):
     """
 
     permission_classes = (AllowAny,)
+    throttle_classes = (AuthIPThrottle, AuthUsernameThrottle)
 
     def post(self, request):
         serializer = GetTokenSerializer(data=request.data)
@@ -144,34 +209,18 @@ class APISignup(APIView):
     queryset = User.objects.all()
     serializer_class = SignUpSerializer
     permission_classes = (AllowAny,)
+    throttle_classes = (AuthIPThrottle, AuthUsernameThrottle)
 
     def post(self, request):
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        username = serializer.data.get("username")
-        email = serializer.data.get("email")
-        try:
-            user, _ = User.objects.get_or_create(
-                username=username, email=email
-            )
-        except IntegrityError:
-            error_message = (
-                constances.EMAIL_TAKEN_ERROR
-                if User.objects.filter(email=email).exists()
-                else constances.USERNAME_TAKEN_ERROR
-            )
-            return Response(
-                error_message,
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        user = serializer.save()
         confirmation_code = default_token_generator.make_token(user)
-        send_mail(
+        outbox.enqueue(
             constances.SUBJECT,
-            message=constances.MESSAGE_EMAIL.format(
-                user.username, confirmation_code
-            ),
-            from_email=constances.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
+            constances.MESSAGE_EMAIL.format(user.username, confirmation_code),
+            constances.DEFAULT_FROM_EMAIL,
+            user.email,
         )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
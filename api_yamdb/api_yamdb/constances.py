@@ -4,12 +4,15 @@ DEFAULT_FROM_EMAIL = "kov.dima.seaman@mail.ru"
 SUBJECT = "Регистрация на сайте"
 EMAIL_TAKEN_ERROR = "Электронная почта уже занята!"
 USERNAME_TAKEN_ERROR = "Имя пользователя уже занято!"
+STALE_REFERENCE_ERROR = "Жанр или категория были удалены, повторите запрос."
 MESSAGE_EMAIL = "Здравствуйте, {}.\nКод подтверждения для доступа: ."
 
 LENGTH_NAME = 150
 LENGTH_EMAIL = 254
 LENGTH_SLUG = 50
 LENGTH_REALNAME = 256
+CONFIRMATION_CODE_LENGTH = 32
+CONFIRMATION_CODE_PLACEHOLDER = "XXXX"
 
 MINYEAR = -32768
 CURRENTYEAR = datetime.datetime.now().year
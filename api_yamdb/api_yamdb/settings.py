@@ -98,15 +98,67 @@ STATIC_URL = "/static/"
 
 STATICFILES_DIRS = ((BASE_DIR / "static/"),)
 
+LOCAL_CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+
+
+def local_cache(name, backend):
+    """
+    Кэш без внешнего сервиса: locmem — в памяти процесса, file — общий для
+    процессов одной машины каталог cache/<name>.
+    """
+    return {
+        "BACKEND": LOCAL_CACHE_BACKENDS[backend],
+        "LOCATION": (
+            str(BASE_DIR / "cache" / name) if backend == "file" else name
+        ),
+    }
+
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalog": {
+        **local_cache("catalog", os.getenv("CATALOG_CACHE", "locmem")),
+        "TIMEOUT": int(os.getenv("CATALOG_CACHE_TIMEOUT", 300)),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", 1000)),
+        },
+    },
+    "throttle": {
+        **local_cache("throttle", os.getenv("THROTTLE_CACHE", "locmem")),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("THROTTLE_CACHE_MAX_ENTRIES", 10000)),
+        },
+    },
+}
+
+JWT_AUTHENTICATION_CLASSES = {
+    "db": "api.authentication.CachedJWTAuthentication",
+    "lru": "api.authentication.VerifiedTokenJWTAuthentication",
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication"
+        JWT_AUTHENTICATION_CLASSES[os.getenv("JWT_AUTHENTICATION", "db")]
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
+    "DEFAULT_THROTTLE_RATES": {
+        "auth_ip": os.getenv("THROTTLE_AUTH_IP", "20/min"),
+        "auth_username": os.getenv("THROTTLE_AUTH_USERNAME", "5/min"),
+    },
+    # Число доверенных прокси перед приложением. При 0 IP для ограничения
+    # частоты берётся из REMOTE_ADDR, а X-Forwarded-For, который клиент
+    # может подставить сам, не учитывается. За одним обратным прокси,
+    # дописывающим свой X-Forwarded-For, задайте NUM_PROXIES=1.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", 0)),
 }
 
 SIMPLE_JWT = {
@@ -114,8 +166,32 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# Сколько секунд api.fields.CachedSlugRelatedField держит найденные по slug
+# жанры и категории в памяти процесса.
+SLUG_CACHE_TIMEOUT = int(os.getenv("SLUG_CACHE_TIMEOUT", 30))
+
+# Сколько секунд пользователь из токена JWT хранится в кэше "default".
+# Кэш сбрасывается только в процессе, изменившем пользователя: при
+# нескольких процессах "default" должен быть общим (Redis, Memcached).
+JWT_USER_CACHE_TIMEOUT = int(os.getenv("JWT_USER_CACHE_TIMEOUT", 60))
+# Сколько проверенных токенов держит в памяти процесса
+# VerifiedTokenJWTAuthentication (JWT_AUTHENTICATION=lru).
+JWT_TOKEN_CACHE_SIZE = int(os.getenv("JWT_TOKEN_CACHE_SIZE", 10000))
+
 AUTH_USER_MODEL = "users.User"
 
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
+
+# Письма ставятся в очередь users.OutboxMessage и отправляются командой
+# send_outbox. OUTBOX_EAGER=1 отправляет их сразу после коммита.
+OUTBOX_EAGER = os.getenv("OUTBOX_EAGER", "0") == "1"
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))
+OUTBOX_RETRY_DELAY = int(os.getenv("OUTBOX_RETRY_DELAY", 60))
+# На сколько секунд send_outbox откладывает забранную порцию: должно
+# хватать на отправку всей порции.
+OUTBOX_LEASE = int(os.getenv("OUTBOX_LEASE", 300))
+# Через сколько дней send_outbox удаляет отправленные и не отправленные
+# за все попытки письма.
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", 7))
@@ -4,10 +4,6 @@ from django.contrib.auth.models import Group
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 
 
-def get_genres(self, obj):
-    return ", ".join([genre.name for genre in obj.genre.all()])
-
-
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ("name",)
@@ -26,13 +22,24 @@ class GenreTitleTabular(admin.TabularInline):
 
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
-    get_genres.short_description = "Жанры"
-    list_display = ("name", "year", "description", "category", "get_genres")
+    list_display = (
+        "name",
+        "year",
+        "description",
+        "category",
+        "get_genres",
+        "rating",
+    )
     search_fields = ["name", "year"]
     list_filter = ("category", "genre")
     list_editable = ("category", "year")
+    readonly_fields = ("rating",)
     inlines = [GenreTitleTabular]
 
+    @admin.display(description="Жанры")
+    def get_genres(self, obj):
+        return ", ".join([genre["name"] for genre in obj.genre_list])
+
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
@@ -0,0 +1,127 @@
+"""
+Выгрузка каталога для команды dump и эндпоинта экспорта.
+
+Строки читаются из базы через iterator(chunk_size=...) и отдаются
+порциями, поэтому расход памяти не зависит от размера таблиц.
+
+CSV повторяет раскладку static/data/*.csv и загружается обратно командой
+load: жанры произведений в нём лежат отдельным набором genre_title, а
+рейтинг load пересчитывает сам. В NDJSON каждая строка — объект JSON;
+у произведений в нём сразу есть слаги жанров и категории и рейтинг.
+"""
+import csv
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from reviews import importer
+from reviews.models import Comment, GenreTitle, Review, Title
+
+CHUNK_SIZE = 2000
+DATASETS = {
+    "titles": (Title, ("id", "name", "year", "category")),
+    "genre_title": (GenreTitle, ("id", "title_id", "genre_id")),
+    "review": (
+        Review,
+        ("id", "title_id", "text", "author", "score", "pub_date"),
+    ),
+    "comments": (Comment, ("id", "review_id", "text", "author", "pub_date")),
+}
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_rows(name, chunk_size, named=False):
+    """
+    Отдаёт строки набора name порциями по chunk_size: кортежи в порядке
+    столбцов CSV или, если named, словари attname -> значение.
+    """
+    model, header = DATASETS[name]
+    columns = importer.get_columns(model, header)
+    queryset = model.objects.order_by("pk")
+    if named:
+        queryset = queryset.values(*columns)
+    else:
+        queryset = queryset.values_list(*columns)
+    return chunked(queryset.iterator(chunk_size=chunk_size), chunk_size)
+
+
+def iter_titles(chunk_size):
+    """
+    Произведения со слагами категории и жанров. Жанры выбираются одним
+    запросом на порцию: prefetch_related с iterator() не работает.
+    """
+    titles = (
+        Title.objects.order_by("pk")
+        .values("id", "name", "year", "description", "rating")
+        .annotate(category_slug=F("category__slug"))
+    )
+    for chunk in chunked(titles.iterator(chunk_size=chunk_size), chunk_size):
+        genres = defaultdict(list)
+        links = (
+            GenreTitle.objects.filter(
+                title_id__in=[title["id"] for title in chunk]
+            )
+            .order_by("genre__slug")
+            .values_list("title_id", "genre__slug")
+        )
+        for title_id, slug in links:
+            genres[title_id].append(slug)
+        for title in chunk:
+            title["category"] = title.pop("category_slug")
+            title["genre"] = genres[title["id"]]
+        yield chunk
+
+
+def drain(buffer):
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return value
+
+
+def csv_chunks(name, chunk_size=CHUNK_SIZE):
+    """Строки CSV: заголовок, затем по куску текста на порцию."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(DATASETS[name][1])
+    yield drain(buffer)
+    for chunk in iter_rows(name, chunk_size):
+        writer.writerows(chunk)
+        yield drain(buffer)
+
+
+def ndjson_chunks(name, chunk_size=CHUNK_SIZE):
+    """Объекты JSON по одному на строку, по куску текста на порцию."""
+    if name == "titles":
+        chunks = iter_titles(chunk_size)
+    else:
+        chunks = iter_rows(name, chunk_size, named=True)
+    for chunk in chunks:
+        yield "".join(
+            json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False)
+            + "\n"
+            for record in chunk
+        )
+
+
+def export(name, output_format, chunk_size=CHUNK_SIZE):
+    """Генератор кусков текста набора name в формате output_format."""
+    if output_format == "csv":
+        return csv_chunks(name, chunk_size)
+    return ndjson_chunks(name, chunk_size)
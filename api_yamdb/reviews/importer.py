@@ -0,0 +1,117 @@
+"""
+Разбор и проверка строк CSV для команды load.
+
+Модуль не импортирует модели на верхнем уровне: его функции выполняются
+и в процессах пула, где Django настраивается в init_worker.
+"""
+import csv
+import io
+import os
+
+import django
+from django.apps import apps
+from django.core.exceptions import ValidationError
+
+FOREIGN_KEYS = {
+    "category": "category_id",
+    "author": "author_id",
+}
+BLOCK_SIZE = 1 << 20
+
+
+def init_worker():
+    if not apps.ready:
+        django.setup()
+
+
+def get_columns(model, header):
+    """Переводит заголовок CSV в attname полей модели."""
+    return [FOREIGN_KEYS.get(column, column) for column in header]
+
+
+def parse_rows(model, columns, rows):
+    """
+    Проверяет строки полями модели и возвращает словари attname -> значение
+    в типах Python. Внешние ключи только приводятся к типу первичного
+    ключа: их наличие проверит база при вставке.
+    """
+    if isinstance(model, str):
+        model = apps.get_model(model)
+    fields = [model._meta.get_field(column) for column in columns]
+    relations = [field for field in fields if field.is_relation]
+    exclude = [
+        field.name
+        for field in model._meta.fields
+        if field.is_relation or field not in fields
+    ]
+    parsed = []
+    for row in rows:
+        values = dict(zip(columns, row))
+        instance = model(**values)
+        try:
+            instance.clean_fields(exclude=exclude)
+            for field in relations:
+                raw = values[field.attname]
+                setattr(
+                    instance,
+                    field.attname,
+                    field.target_field.to_python(raw) if raw else None,
+                )
+        except ValidationError as error:
+            raise ValidationError(f"{row}: {error}")
+        parsed.append(
+            {column: getattr(instance, column) for column in columns}
+        )
+    return parsed
+
+
+def parse_range(model_label, columns, path, start, end):
+    """Разбирает диапазон байтов [start, end) файла, выровненный по записям."""
+    with open(path, "rb") as source:
+        source.seek(start)
+        data = source.read(end - start).decode("utf-8")
+    reader = csv.reader(io.StringIO(data, newline=""))
+    return parse_rows(model_label, columns, reader)
+
+
+def split_ranges(path, chunk_bytes, start=0):
+    """
+    Делит файл после заголовка на диапазоны примерно по chunk_bytes байт.
+    Граница ставится только на перевод строки вне кавычек: чётность
+    числа кавычек от начала данных показывает, открыто ли поле в кавычках
+    (экранированная кавычка "" чётность не меняет). start — граница
+    записи, с которой начинать, например смещение из журнала загрузки.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as source:
+        chunk_start = max(len(source.readline()), start)
+        source.seek(chunk_start)
+        target = chunk_start + chunk_bytes
+        offset = chunk_start
+        quoted = False
+        while True:
+            block = source.read(BLOCK_SIZE)
+            if not block:
+                break
+            i = 0
+            while i < len(block):
+                if offset + i < target:
+                    j = min(len(block), target - offset)
+                    quoted ^= block.count(b'"', i, j) % 2 == 1
+                    i = j
+                    continue
+                newline = block.find(b"\n", i)
+                if newline == -1:
+                    quoted ^= block.count(b'"', i) % 2 == 1
+                    break
+                quoted ^= block.count(b'"', i, newline) % 2 == 1
+                i = newline + 1
+                if not quoted:
+                    ranges.append((chunk_start, offset + i))
+                    chunk_start = offset + i
+                    target = chunk_start + chunk_bytes
+            offset += len(block)
+    if chunk_start < size:
+        ranges.append((chunk_start, size))
+    return ranges
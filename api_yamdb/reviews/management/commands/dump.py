@@ -0,0 +1,56 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from loguru import logger
+
+from reviews import exporter
+
+
+class Command(BaseCommand):
+    help = "Выгрузка произведений, отзывов и комментариев в CSV или NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", required=True, help="Каталог для выгружаемых файлов."
+        )
+        parser.add_argument(
+            "--format",
+            choices=exporter.CONTENT_TYPES,
+            default="csv",
+            help="csv — раскладка static/data для load, ndjson — JSON.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=exporter.CHUNK_SIZE,
+            help="Количество строк, читаемых из базы за раз.",
+        )
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            choices=exporter.DATASETS,
+            help="Выгрузить только перечисленные наборы.",
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(options["path"], exist_ok=True)
+        output_format = options["format"]
+        for name in options["only"] or exporter.DATASETS:
+            file_name = f"{name}.{output_format}"
+            start = time.perf_counter()
+            with open(
+                os.path.join(options["path"], file_name),
+                "w",
+                encoding="utf-8",
+                newline="",
+            ) as output:
+                for chunk in exporter.export(
+                    name, output_format, options["chunk_size"]
+                ):
+                    output.write(chunk)
+                size = output.tell()
+            logger.info(
+                f"Выгружен файл {file_name}: {size} байт за "
+                f"{time.perf_counter() - start:.2f} с"
+            )
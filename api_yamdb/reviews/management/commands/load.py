@@ -1,50 +1,271 @@
 import csv
+import hashlib
 import os
+import time
+from collections import deque
+from contextlib import nullcontext
+from multiprocessing import Pool
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand
+from django.db import DatabaseError, transaction
 from loguru import logger
 
-from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews import importer, search
+from reviews.models import (Category, Comment, Genre, GenreTitle, ImportFile,
+                            Review, Title)
 from users.models import User
 
+FILES = (
+    ("category", Category),
+    ("genre", Genre),
+    ("titles", Title),
+    ("users", User),
+    ("review", Review),
+    ("comments", Comment),
+    ("genre_title", GenreTitle),
+)
+CHUNK_BYTES = 4 << 20
+
+
+def file_checksum(file_path):
+    checksum = hashlib.sha256()
+    with open(file_path, "rb") as source:
+        for block in iter(lambda: source.read(importer.BLOCK_SIZE), b""):
+            checksum.update(block)
+    return checksum.hexdigest()
+
 
 class Command(BaseCommand):
     help = "Импорт данных из файлов CSV."
 
-    def handle(self, *args, **kwargs):
-        name_models = {
-            "category": Category,
-            "genre": Genre,
-            "titles": Title,
-            "users": User,
-            "review": Review,
-            "comments": Comment,
-            "genre_title": GenreTitle,
-        }
-        for name, model in name_models.items():
-            file_path = os.path.join(
-                settings.BASE_DIR, "static", "data", f"{name}.csv"
-            )
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=os.path.join(settings.BASE_DIR, "static", "data"),
+            help="Каталог с файлами CSV.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество строк в одном INSERT.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help=(
+                "Число процессов для разбора и проверки CSV. Запись в базу "
+                "всегда идёт из одного процесса."
+            ),
+        )
+        parser.add_argument(
+            "--upsert",
+            action="store_true",
+            help=(
+                "Обновлять существующие строки по id вместо ошибки и "
+                "пропускать файлы, не изменившиеся с прошлой загрузки."
+            ),
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help=(
+                "Фиксировать каждую порцию отдельно и продолжать прерванную "
+                "загрузку с последней зафиксированной порции."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.workers = options["workers"]
+        self.pool = None
+        if self.workers > 1:
+            self.pool = Pool(self.workers, initializer=importer.init_worker)
+        try:
+            self.load_files()
+        finally:
+            if self.pool is not None:
+                self.pool.terminate()
+
+    def load_files(self):
+        loaded = False
+        for name, model in FILES:
+            file_path = os.path.join(self.options["path"], f"{name}.csv")
             try:
-                with open(file_path, encoding="utf-8") as data:
-                    logger.info(f"Загрузка файла {name}.csv")
-                    objects = []
-                    for row in csv.DictReader(data):
-                        fields = {}
-                        for key, value in row.items():
-                            if key == "category":
-                                fields[key], _ = name_models[
-                                    key
-                                ].objects.get_or_create(id=value)
-                            elif key == "author":
-                                fields[key] = User.objects.get(id=value)
-                            else:
-                                fields[key] = value
-                        objects.append(model(**fields))
-                    model.objects.bulk_create(objects)
-                    logger.info(f"Успешно загружен файл {name}.csv")
+                checksum = file_checksum(file_path)
+                journal = ImportFile.objects.filter(name=name).first()
+                journal = journal or ImportFile(name=name, checksum="")
+                unchanged = journal.checksum == checksum
+                if (
+                    unchanged
+                    and journal.finished
+                    and (self.options["upsert"] or self.options["resume"])
+                ):
+                    logger.info(f"Файл {name}.csv не изменился, пропущен")
+                    continue
+                if not (self.options["resume"] and unchanged):
+                    journal.checksum = checksum
+                    journal.rows, journal.position = 0, 0
+                    journal.finished = False
+                if journal.rows:
+                    logger.info(
+                        f"Продолжение загрузки {name}.csv "
+                        f"после строки {journal.rows}"
+                    )
+                else:
+                    logger.info(f"Загрузка файла {name}.csv")
+                stats, elapsed = self.load_file(model, file_path, journal)
+                loaded = True
+                logger.info(
+                    f"Успешно загружен файл {name}.csv: {stats['rows']} "
+                    f"строк за {elapsed:.2f} с "
+                    f"({stats['rows'] / elapsed:.0f} строк/с), "
+                    f"добавлено {stats['created']}, "
+                    f"обновлено {stats['updated']}"
+                )
             except FileNotFoundError:
                 logger.error(f"Файл {name}.csv не найден")
-            except Exception as e:
+            except (
+                csv.Error,
+                DatabaseError,
+                ValidationError,
+                ValueError,
+            ) as e:
                 logger.error(f"Ошибка в процессе загрузки {name}.csv: {e}")
+        if loaded:
+            Title.objects.recount_rating()
+            Title.objects.refresh_genres()
+            search.rebuild_index(
+                Title.objects.values_list("id", "name").iterator(), "default"
+            )
+        self.report()
+
+    def load_file(self, model, file_path, journal):
+        """
+        Загружает файл порциями. Внешние ключи пишутся сразу в *_id, без
+        запросов к связанным таблицам. Без --resume весь файл и запись
+        журнала идут в одной транзакции; с --resume каждая порция
+        фиксируется вместе с журналом, где запоминаются число строк и
+        смещение следующей порции.
+        """
+        start = time.perf_counter()
+        stats = {"rows": 0, "created": 0, "updated": 0}
+        with open(file_path, encoding="utf-8", newline="") as data:
+            header = next(csv.reader(data), None)
+        if header is None:
+            raise ValueError("файл пуст, нет строки заголовка")
+        columns = importer.get_columns(model, header)
+        resume = self.options["resume"]
+        with nullcontext() if resume else transaction.atomic():
+            chunks = self.parse_file(model, columns, file_path, journal)
+            for chunk, position in chunks:
+                with transaction.atomic() if resume else nullcontext():
+                    created, updated = self.write_chunk(model, columns, chunk)
+                    journal.rows += len(chunk)
+                    journal.position = position
+                    if resume:
+                        journal.save()
+                stats["rows"] += len(chunk)
+                stats["created"] += created
+                stats["updated"] += updated
+            journal.finished = True
+            journal.save()
+        return stats, time.perf_counter() - start
+
+    def write_chunk(self, model, columns, chunk):
+        batch_size = self.options["batch_size"]
+        if self.options["upsert"]:
+            return self.upsert_chunk(model, columns, chunk, batch_size)
+        model.objects.bulk_create(
+            [model(**fields) for fields in chunk], batch_size=batch_size
+        )
+        return len(chunk), 0
+
+    def upsert_chunk(self, model, columns, chunk, batch_size):
+        """
+        Вставляет новые строки и обновляет только отличающиеся от базы.
+        Поля auto_now/auto_now_add не сравниваются и не перезаписываются,
+        как и при обычной вставке.
+        """
+        pk = model._meta.pk.attname
+        if pk not in columns:
+            raise ValueError(f"для --upsert нужен столбец {pk}")
+        automatic = {
+            field.attname
+            for field in model._meta.fields
+            if getattr(field, "auto_now", False)
+            or getattr(field, "auto_now_add", False)
+        }
+        fields = [
+            column
+            for column in columns
+            if column != pk and column not in automatic
+        ]
+        existing = {
+            row[pk]: row
+            for row in model.objects.filter(
+                pk__in=[values[pk] for values in chunk]
+            ).values(pk, *fields)
+        }
+        new, changed = [], []
+        for values in chunk:
+            current = existing.get(values[pk])
+            if current is None:
+                new.append(model(**values))
+            elif any(current[field] != values[field] for field in fields):
+                changed.append(model(**values))
+        model.objects.bulk_create(new, batch_size=batch_size)
+        if changed and fields:
+            model.objects.bulk_update(changed, fields, batch_size=batch_size)
+        return len(new), len(changed)
+
+    def parse_file(self, model, columns, file_path, journal):
+        """
+        Отдаёт проверенные порции файла в исходном порядке вместе со
+        смещением конца порции. Файл делится на диапазоны байтов,
+        выровненные по записям, начиная с journal.position. С пулом
+        процессов диапазоны разбираются параллельно; в работе держится не
+        больше двух диапазонов на процесс, чтобы память не росла.
+        """
+        ranges = importer.split_ranges(
+            file_path, CHUNK_BYTES, journal.position
+        )
+        if self.pool is None:
+            for start, end in ranges:
+                rows = importer.parse_range(
+                    model, columns, file_path, start, end
+                )
+                yield rows, end
+            return
+        pending = deque()
+        for start, end in ranges:
+            result = self.pool.apply_async(
+                importer.parse_range,
+                (model._meta.label, columns, file_path, start, end),
+            )
+            pending.append((result, end))
+            if len(pending) >= self.workers * 2:
+                result, end = pending.popleft()
+                yield result.get(), end
+        while pending:
+            result, end = pending.popleft()
+            yield result.get(), end
+
+    def report(self):
+        """Сводка по моделям: строк загружено из файла и строк в базе."""
+        journals = {
+            journal.name: journal for journal in ImportFile.objects.all()
+        }
+        for name, model in FILES:
+            journal = journals.get(name)
+            if journal is None:
+                continue
+            state = "полностью" if journal.finished else "частично"
+            logger.info(
+                f"{model._meta.verbose_name_plural}: из {name}.csv "
+                f"загружено {state} {journal.rows} строк, "
+                f"в базе {model.objects.count()}"
+            )
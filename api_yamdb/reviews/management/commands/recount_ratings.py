@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from loguru import logger
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = "Пересчёт хранимого рейтинга произведений по таблице отзывов."
+
+    def handle(self, *args, **kwargs):
+        updated = Title.objects.recount_rating()
+        logger.info(f"Рейтинг пересчитан для {updated} произведений")
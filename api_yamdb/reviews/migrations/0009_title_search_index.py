@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from reviews import search
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if not search.create_index(connection):
+        return
+    Title = apps.get_model('reviews', 'Title')
+    search.rebuild_index(
+        Title.objects.using(connection.alias)
+        .values_list('id', 'name')
+        .iterator(),
+        connection.alias,
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    search.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_rating'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 20:31
+
+from django.db import migrations, models
+
+
+def mark_finished(apps, schema_editor):
+    ImportFile = apps.get_model('reviews', 'ImportFile')
+    ImportFile.objects.update(finished=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_importfile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importfile',
+            name='finished',
+            field=models.BooleanField(default=False, verbose_name='Загружен полностью'),
+        ),
+        migrations.AddField(
+            model_name='importfile',
+            name='position',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Смещение'),
+        ),
+        migrations.RunPython(mark_finished, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2 on 2026-10-18 20:56
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def fill_genre_list(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    genre_lists = defaultdict(list)
+    links = GenreTitle.objects.order_by(
+        'genre__name', 'genre_id'
+    ).values_list('title_id', 'genre__name', 'genre__slug')
+    for title_id, name, slug in links:
+        genre_lists[title_id].append({'name': name, 'slug': slug})
+    Title.objects.bulk_update(
+        [
+            Title(pk=pk, genre_list=genre_list)
+            for pk, genre_list in genre_lists.items()
+        ],
+        ('genre_list',),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_importfile_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='genre_list',
+            field=models.JSONField(default=list, editable=False, help_text='Копия жанров произведения: [{name, slug}, ...].', verbose_name='Жанры для выдачи'),
+        ),
+        migrations.RunPython(fill_genre_list, migrations.RunPython.noop),
+    ]
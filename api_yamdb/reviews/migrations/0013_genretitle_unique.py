@@ -0,0 +1,51 @@
+# Generated by Django 3.2 on 2026-10-18 20:58
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicates(apps, schema_editor):
+    """Оставляет по одной связи на пару (произведение, жанр)."""
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    keep = (
+        GenreTitle.objects.values('title_id', 'genre_id')
+        .annotate(keep=Min('id'))
+        .values('keep')
+    )
+    duplicates = GenreTitle.objects.exclude(id__in=keep)
+    titles = set(duplicates.values_list('title_id', flat=True))
+    if not titles:
+        return
+    duplicates.delete()
+    genre_lists = defaultdict(list)
+    links = GenreTitle.objects.filter(title_id__in=titles).order_by(
+        'genre__name', 'genre_id'
+    ).values_list('title_id', 'genre__name', 'genre__slug')
+    for title_id, name, slug in links:
+        genre_lists[title_id].append({'name': name, 'slug': slug})
+    Title.objects.bulk_update(
+        [
+            Title(pk=pk, genre_list=genre_list)
+            for pk, genre_list in genre_lists.items()
+        ],
+        ('genre_list',),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0012_title_genre_list'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='genretitle',
+            constraint=models.UniqueConstraint(fields=('title', 'genre'), name='unique_title_genre'),
+        ),
+    ]
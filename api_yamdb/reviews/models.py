@@ -1,10 +1,27 @@
+from contextvars import ContextVar
+from operator import attrgetter
+
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
 
 from api_yamdb import constances
+from reviews import search
 from reviews.basemodel import NameSlugModel, TextAuthorPubdateModel
 from reviews.validators import year_validator
 
+# Произведения, жанры которых сейчас меняет Title.set_genres.
+_titles_setting_genres = ContextVar(
+    "titles_setting_genres", default=frozenset()
+)
+# Удаляемые жанры: их связи с произведениями удаляются каскадом.
+_deleting_genres = ContextVar("deleting_genres", default=frozenset())
+
 
 class Category(NameSlugModel):
     """Модель для категорий произведений"""
@@ -21,6 +38,82 @@ class Genre(NameSlugModel):
         verbose_name = "Жанр"
         verbose_name_plural = "Жанры"
 
+    def delete(self, *args, **kwargs):
+        # Обработчики удаления GenreTitle не пересобирают genre_list для
+        # каскадно удаляемых связей: это делает genre_post_delete.
+        token = _deleting_genres.set(_deleting_genres.get() | {self.pk})
+        try:
+            return super().delete(*args, **kwargs)
+        finally:
+            _deleting_genres.reset(token)
+
+
+class TitleQuerySet(models.QuerySet):
+    """Запросы для поддержки хранимых рейтинга и списка жанров."""
+
+    def shift_rating(self, score_delta, count_delta):
+        """Сдвигает счётчики оценок и пересчитывает рейтинг одним UPDATE."""
+        score_sum = F("score_sum") + score_delta
+        score_count = F("score_count") + count_delta
+        return self.update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=Cast(score_sum, FloatField()) / NullIf(score_count, 0),
+            updated_at=timezone.now(),
+        )
+
+    def recount_rating(self):
+        """Пересчитывает счётчики оценок с нуля по таблице отзывов."""
+        reviews = (
+            Review.objects.filter(title=OuterRef("pk"))
+            .order_by()
+            .values("title")
+        )
+        score_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum("score")).values("total")), 0
+        )
+        score_count = Coalesce(
+            Subquery(reviews.annotate(total=Count("pk")).values("total")), 0
+        )
+        return self.update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=Cast(score_sum, FloatField()) / NullIf(score_count, 0),
+            updated_at=timezone.now(),
+        )
+
+    def refresh_genres(self, batch_size=1000):
+        """
+        Пересобирает genre_list из GenreTitle: по запросу на чтение и
+        bulk_update на каждые batch_size произведений. Возвращает списки
+        жанров по id произведения.
+        """
+        ids = list(self.values_list("pk", flat=True))
+        now = timezone.now()
+        genre_lists = {}
+        for start in range(0, len(ids), batch_size):
+            end = start + batch_size
+            batch = {pk: [] for pk in ids[start:end]}
+            links = (
+                GenreTitle.objects.filter(title_id__in=batch)
+                .order_by(
+                    *[f"genre__{field}" for field in Genre._meta.ordering],
+                    "genre_id",
+                )
+                .values_list("title_id", "genre__name", "genre__slug")
+            )
+            for title_id, name, slug in links:
+                batch[title_id].append({"name": name, "slug": slug})
+            Title.objects.bulk_update(
+                [
+                    Title(pk=pk, genre_list=genre_list, updated_at=now)
+                    for pk, genre_list in batch.items()
+                ],
+                ("genre_list", "updated_at"),
+            )
+            genre_lists.update(batch)
+        return genre_lists
+
 
 class Title(models.Model):
     """Модель для произведений"""
@@ -47,6 +140,31 @@ class Title(models.Model):
         db_index=True,
     )
     description = models.TextField("Описание произведения", blank=True)
+    score_sum = models.PositiveIntegerField(
+        "Сумма оценок", default=0, editable=False
+    )
+    score_count = models.PositiveIntegerField(
+        "Количество оценок", default=0, editable=False
+    )
+    rating = models.FloatField(
+        "Рейтинг", null=True, editable=False, db_index=True
+    )
+    genre_list = models.JSONField(
+        "Жанры для выдачи",
+        default=list,
+        editable=False,
+        help_text="Копия жанров произведения: [{name, slug}, ...].",
+    )
+    updated_at = models.DateTimeField(
+        "Дата изменения",
+        auto_now=True,
+        help_text=(
+            "Меняется при любом изменении выдачи произведения, в том числе "
+            "рейтинга, жанров и категории."
+        ),
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = (
@@ -59,6 +177,50 @@ class Title(models.Model):
     def __str__(self):
         return self.name[:30]
 
+    @staticmethod
+    def build_genre_list(genres):
+        """Значение genre_list для объектов жанров genres."""
+        return [
+            {"name": genre.name, "slug": genre.slug}
+            for genre in sorted(
+                {genre.pk: genre for genre in genres}.values(),
+                key=attrgetter(*Genre._meta.ordering, "pk"),
+            )
+        ]
+
+    def set_genres(self, genres, created=False):
+        """
+        Приводит жанры произведения к набору genres: одним DELETE для
+        лишних связей и одним INSERT для новых. genre_list собирается из
+        переданных объектов, без повторного чтения, и сохраняется
+        следующим save() произведения, который и сбрасывает кэш каталога.
+        created=True означает, что произведение только что создано и
+        связей у него нет: текущие жанры тогда не читаются.
+        """
+        wanted = {genre.pk for genre in genres}
+        links = GenreTitle.objects.filter(title=self)
+        current = set()
+        if not created:
+            current = set(links.values_list("genre_id", flat=True))
+        # Обработчики удаления GenreTitle не пересобирают genre_list
+        # этого произведения: он собирается здесь.
+        token = _titles_setting_genres.set(
+            _titles_setting_genres.get() | {self.pk}
+        )
+        try:
+            with transaction.atomic(using=links.db):
+                if current - wanted:
+                    links.filter(genre_id__in=current - wanted).delete()
+                GenreTitle.objects.bulk_create(
+                    [
+                        GenreTitle(title=self, genre_id=genre_id)
+                        for genre_id in wanted - current
+                    ]
+                )
+        finally:
+            _titles_setting_genres.reset(token)
+        self.genre_list = self.build_genre_list(genres)
+
 
 class GenreTitle(models.Model):
     title = models.ForeignKey(
@@ -77,6 +239,11 @@ class GenreTitle(models.Model):
     class Meta:
         verbose_name = "Жанр"
         verbose_name_plural = "Жанры"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("title", "genre"), name="unique_title_genre"
+            ),
+        )
 
     def __str__(self):
         return f"{self.title} {self.genre}"
@@ -108,6 +275,15 @@ class Review(TextAuthorPubdateModel):
             ),
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._rated = (
+            instance.__dict__.get("title_id"),
+            instance.__dict__.get("score"),
+        )
+        return instance
+
 
 class Comment(TextAuthorPubdateModel):
     """Модель комментариев для отзывов."""
@@ -122,3 +298,146 @@ class Comment(TextAuthorPubdateModel):
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
         default_related_name = "comments"
+
+
+class ImportFile(models.Model):
+    """
+    Журнал импорта файла командой load: контрольная сумма, число
+    зафиксированных строк и смещение в байтах, с которого продолжать.
+    """
+
+    name = models.CharField("Файл", max_length=255, unique=True)
+    checksum = models.CharField("SHA-256", max_length=64)
+    rows = models.PositiveIntegerField("Строк")
+    position = models.PositiveBigIntegerField("Смещение", default=0)
+    finished = models.BooleanField("Загружен полностью", default=False)
+    loaded_at = models.DateTimeField("Загружен", auto_now=True)
+
+    class Meta:
+        verbose_name = "Импортированный файл"
+        verbose_name_plural = "Импортированные файлы"
+
+    def __str__(self):
+        return self.name
+
+
+@receiver(post_save, sender=Review)
+def review_post_save(sender, instance, created, **kwargs):
+    """Обновляет хранимый рейтинг произведения при сохранении отзыва."""
+    titles = Title.objects.filter(pk=instance.title_id)
+    old_title_id, old_score = getattr(instance, "_rated", (None, None))
+    if created:
+        titles.shift_rating(instance.score, 1)
+    elif old_title_id is None or old_score is None:
+        titles.recount_rating()
+    elif old_title_id != instance.title_id:
+        Title.objects.filter(pk=old_title_id).shift_rating(-old_score, -1)
+        titles.shift_rating(instance.score, 1)
+    elif old_score != instance.score:
+        titles.shift_rating(instance.score - old_score, 0)
+    instance._rated = (instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def review_post_delete(sender, instance, **kwargs):
+    """Вычитает оценку удалённого отзыва из рейтинга произведения."""
+    old_title_id, old_score = getattr(instance, "_rated", (None, None))
+    if old_title_id is None or old_score is None:
+        old_title_id, old_score = instance.title_id, instance.score
+    Title.objects.filter(pk=old_title_id).shift_rating(-old_score, -1)
+
+
+def refresh_title_genres(title_ids, instance=None):
+    """
+    Обновляет genre_list произведений title_ids. Если передан объект
+    instance, его поле тоже обновляется, чтобы ответ на запрос записи
+    сразу содержал новые жанры.
+    """
+    genre_lists = Title.objects.filter(pk__in=title_ids).refresh_genres()
+    if instance is not None and instance.pk in genre_lists:
+        instance.genre_list = genre_lists[instance.pk]
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Изменения через title.genre и genre.titles (API, set/add/remove)."""
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_title_genres([instance.pk], instance)
+        return
+    if action == "pre_clear":
+        instance._cleared_titles = list(
+            instance.titles.values_list("pk", flat=True)
+        )
+    elif action in ("post_add", "post_remove"):
+        refresh_title_genres(pk_set)
+    elif action == "post_clear":
+        refresh_title_genres(instance.__dict__.pop("_cleared_titles", []))
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def genre_title_changed(sender, instance, **kwargs):
+    """Изменения самих строк GenreTitle, например из инлайна админки."""
+    if (
+        instance.title_id in _titles_setting_genres.get()
+        or instance.genre_id in _deleting_genres.get()
+    ):
+        return
+    refresh_title_genres([instance.title_id])
+
+
+@receiver(post_save, sender=Genre)
+def genre_post_save(sender, instance, created, **kwargs):
+    """Переименование жанра или смена slug."""
+    if not created:
+        refresh_title_genres(
+            GenreTitle.objects.filter(genre=instance).values("title_id")
+        )
+
+
+@receiver(post_save, sender=Category)
+def category_post_save(sender, instance, created, **kwargs):
+    """Переименование категории меняет выдачу её произведений."""
+    if not created:
+        Title.objects.filter(category=instance).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(pre_delete, sender=Category)
+def category_pre_delete(sender, instance, **kwargs):
+    """Произведения удаляемой категории останутся без неё."""
+    Title.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Genre)
+def genre_pre_delete(sender, instance, **kwargs):
+    """
+    Запоминает произведения удаляемого жанра: их genre_list пересобирается
+    один раз после удаления. При удалении через Genre.delete это
+    единственная пересборка, а не по одной на каждую каскадную связь.
+    """
+    instance._deleted_titles = list(
+        GenreTitle.objects.filter(genre=instance).values_list(
+            "title_id", flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=Genre)
+def genre_post_delete(sender, instance, **kwargs):
+    refresh_title_genres(instance.__dict__.pop("_deleted_titles", []))
+
+
+@receiver(post_save, sender=Title)
+def title_post_save(sender, instance, using, update_fields, **kwargs):
+    """Обновляет название произведения в поисковом индексе."""
+    if update_fields is not None and "name" not in update_fields:
+        return
+    search.index_titles([(instance.pk, instance.name)], using)
+
+
+@receiver(post_delete, sender=Title)
+def title_post_delete(sender, instance, using, **kwargs):
+    search.unindex_titles([instance.pk], using)
@@ -0,0 +1,150 @@
+"""
+Полнотекстовый поиск произведений по названию.
+
+На SQLite используется виртуальная таблица FTS5 с токенизатором unicode61:
+он приводит регистр любых букв, включая кириллицу. Буква «ё» дополнительно
+заменяется на «е» и при индексации, и в запросе. Каждое слово запроса
+ищется как префикс, результаты ранжируются по bm25. На других СУБД, а
+также если FTS5 недоступен, поиск сводится к icontains по каждому слову.
+"""
+import re
+
+from django.db import OperationalError, connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "reviews_title_fts"
+RANK_FIELD = "search_rank"
+
+_available = set()
+
+
+def normalize(text):
+    """Приводит текст к виду, в котором он хранится в индексе."""
+    return text.casefold().replace("ё", "е")
+
+
+def get_terms(query):
+    return re.findall(r"\w+", normalize(query))
+
+
+def is_available(using):
+    """Проверяет, что индекс FTS5 создан в базе using."""
+    if using in _available:
+        return True
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+    if FTS_TABLE in tables:
+        _available.add(using)
+        return True
+    return False
+
+
+def create_index(connection):
+    """Создаёт таблицу индекса. Возвращает False, если FTS5 не собран."""
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING "
+                "fts5(name, tokenize='unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            return False
+    return True
+
+
+def drop_index(connection):
+    _available.discard(connection.alias)
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def index_titles(rows, using):
+    """Добавляет или обновляет в индексе пары (id, название)."""
+    if not is_available(using):
+        return
+    rows = [(pk, normalize(name)) for pk, name in rows]
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+            [(pk,) for pk, _ in rows],
+        )
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, name) VALUES (%s, %s)", rows
+        )
+
+
+def unindex_titles(ids, using):
+    if not is_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+            [(pk,) for pk in ids],
+        )
+
+
+def rebuild_index(rows, using, chunk_size=2000):
+    """Перестраивает индекс целиком по итератору пар (id, название)."""
+    if not is_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        chunk = []
+        for pk, name in rows:
+            chunk.append((pk, normalize(name)))
+            if len(chunk) >= chunk_size:
+                cursor.executemany(
+                    f"INSERT INTO {FTS_TABLE} (rowid, name) "
+                    "VALUES (%s, %s)",
+                    chunk,
+                )
+                chunk = []
+        if chunk:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, name) VALUES (%s, %s)",
+                chunk,
+            )
+
+
+def search_titles(queryset, query):
+    """
+    Фильтрует произведения по названию. При наличии индекса добавляет
+    аннотацию search_rank (меньше — релевантнее) и сортирует по ней.
+    """
+    terms = get_terms(query)
+    if not terms:
+        return queryset.filter(name__icontains=query)
+    if not is_available(queryset.db):
+        condition = Q()
+        for term in terms:
+            condition &= Q(name__icontains=term)
+        return queryset.filter(condition)
+
+    match = " ".join(f'"{term}"*' for term in terms)
+    table = queryset.model._meta.db_table
+    return (
+        queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                (match,),
+            )
+        )
+        .annotate(
+            **{
+                RANK_FIELD: RawSQL(
+                    f"SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} "
+                    f"MATCH %s AND rowid = {table}.id",
+                    (match,),
+                    output_field=FloatField(),
+                )
+            }
+        )
+        .order_by(RANK_FIELD, *queryset.model._meta.ordering)
+    )
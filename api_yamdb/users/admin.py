@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from .models import User
+from .models import OutboxMessage, User
 
 
 @admin.register(User)
@@ -10,3 +10,14 @@ class CustomUserAdmin(BaseUserAdmin):
     list_display = ('username', 'email', 'role')
     list_display_links = ('username', 'email')
     list_editable = ('role',)
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'created_at', 'attempts',
+                    'sent_at')
+    list_filter = ('sent_at',)
+    search_fields = ('recipient',)
+    readonly_fields = ('created_at', 'attempts', 'last_error', 'sent_at')
+    # Текст неотправленного письма содержит код подтверждения.
+    exclude = ('body',)
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from loguru import logger
+
+from api_yamdb import constances
+from users.models import User, generate_confirmation_code
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет код подтверждения у пользователей, созданных без него "
+        "(например, загруженных bulk_create до появления кода по "
+        "умолчанию)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество пользователей в одном UPDATE.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        missing = User.objects.filter(
+            confirmation_code__in=(
+                constances.CONFIRMATION_CODE_PLACEHOLDER,
+                "",
+            )
+        )
+        updated = 0
+        # Каждая порция после обновления выпадает из выборки, поэтому
+        # следующая снова берётся с начала, без курсора поверх записи.
+        while True:
+            ids = list(missing.values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                break
+            users = [
+                User(pk=pk, confirmation_code=generate_confirmation_code())
+                for pk in ids
+            ]
+            User.objects.bulk_update(users, ("confirmation_code",))
+            updated += len(users)
+        logger.info(f"Код подтверждения заполнен у {updated} пользователей")
@@ -0,0 +1,82 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from loguru import logger
+
+from users import outbox
+
+
+class Command(BaseCommand):
+    help = "Отправка писем из очереди OutboxMessage."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Количество писем, забираемых из очереди за раз.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Пауза в секундах, когда очередь пуста.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Отправить готовые письма и завершиться.",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=None,
+            help=(
+                "Через сколько дней удалять отправленные и не отправленные "
+                "письма (по умолчанию OUTBOX_RETENTION_DAYS)."
+            ),
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Только показать размер очереди.",
+        )
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            self.log_stats()
+            return
+        connection = get_connection()
+        try:
+            while True:
+                start = time.perf_counter()
+                sent, failed = outbox.send_batch(
+                    options["batch_size"], connection
+                )
+                if sent or failed:
+                    elapsed = time.perf_counter() - start
+                    logger.info(
+                        f"Отправлено писем: {sent}, с ошибкой: {failed}, "
+                        f"{(sent + failed) / elapsed:.1f} писем/с"
+                    )
+                if sent + failed == options["batch_size"]:
+                    continue
+                deleted = outbox.purge(options["retention_days"])
+                if deleted:
+                    logger.info(f"Удалено старых писем: {deleted}")
+                self.log_stats()
+                if options["once"]:
+                    return
+                connection.close()
+                time.sleep(options["interval"])
+        finally:
+            connection.close()
+
+    def log_stats(self):
+        stats = outbox.stats()
+        logger.info(
+            f"Очередь писем: готовы {stats['ready']}, "
+            f"отложены {stats['deferred']}, отправлены {stats['sent']}, "
+            f"не отправлены {stats['failed']}"
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 3.2 on 2026-10-18 20:38
+
+from django.db import migrations, models
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='confirmation_code',
+            field=models.CharField(default=users.models.generate_confirmation_code, help_text='Введите код подтверждения,который был отправлен на ваш email', max_length=150, verbose_name='Код'),
+        ),
+    ]
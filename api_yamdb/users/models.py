@@ -1,14 +1,21 @@
 from django.contrib.auth.models import AbstractUser
-from django.contrib.auth.tokens import default_token_generator
 from django.db import models
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.crypto import get_random_string
 
 from api_yamdb import constances
 
 from .validator import username_valid
 
 
+def generate_confirmation_code():
+    """
+    Код по умолчанию для новых пользователей. Он вычисляется при создании
+    объекта, поэтому попадает в тот же INSERT, в том числе в bulk_create.
+    """
+    return get_random_string(constances.CONFIRMATION_CODE_LENGTH)
+
+
 class User(AbstractUser):
     """Кастомная модель User"""
 
@@ -50,7 +57,7 @@ class User(AbstractUser):
     confirmation_code = models.CharField(
         max_length=constances.LENGTH_NAME,
         verbose_name="Код",
-        default="XXXX",
+        default=generate_confirmation_code,
         help_text=(
             "Введите код подтверждения," "который был отправлен на ваш email"
         ),
@@ -73,9 +80,27 @@ class User(AbstractUser):
         return self.role == self.ADMIN or self.is_superuser
 
 
-@receiver(post_save, sender=User)
-def post_save(sender, instance, created, **kwargs):
-    if created:
-        confirmation_code = default_token_generator.make_token(instance)
-        instance.confirmation_code = confirmation_code
-        instance.save()
+class OutboxMessage(models.Model):
+    """
+    Письмо в очереди на отправку. Пока sent_at пуст, письмо ждёт
+    отправки: не раньше send_after и не больше OUTBOX_MAX_ATTEMPTS попыток.
+    """
+
+    subject = models.CharField("Тема", max_length=255)
+    body = models.TextField("Текст")
+    from_email = models.EmailField("Отправитель")
+    recipient = models.EmailField("Получатель")
+    created_at = models.DateTimeField("Создано", auto_now_add=True)
+    send_after = models.DateTimeField("Отправить после", default=timezone.now)
+    attempts = models.PositiveSmallIntegerField("Попыток", default=0)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    sent_at = models.DateTimeField("Отправлено", null=True, blank=True)
+
+    class Meta:
+        ordering = ("send_after", "id")
+        indexes = [models.Index(fields=("sent_at", "send_after"))]
+        verbose_name = "Письмо в очереди"
+        verbose_name_plural = "Очередь писем"
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject}"
@@ -0,0 +1,185 @@
+"""
+Очередь исходящих писем в базе.
+
+Представление только записывает письмо в OutboxMessage и сразу отвечает,
+а отправкой занимается команда send_outbox: она забирает письма порциями
+и шлёт их через одно открытое соединение почтового бэкенда. Неудачная
+попытка откладывает письмо с экспоненциальной задержкой; после
+OUTBOX_MAX_ATTEMPTS попыток письмо остаётся в базе с последней ошибкой.
+
+Текст письма содержит код подтверждения, поэтому он стирается, как
+только письмо отправлено или попытки кончились. Сами строки удаляются
+функцией purge через OUTBOX_RETENTION_DAYS дней.
+
+С OUTBOX_EAGER письмо отправляется сразу после коммита транзакции, в
+которой оно поставлено в очередь, — для разработки и тестов.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from users.models import OutboxMessage
+
+
+def max_attempts():
+    return settings.OUTBOX_MAX_ATTEMPTS
+
+
+def enqueue(subject, body, from_email, recipient):
+    message = OutboxMessage.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipient=recipient,
+    )
+    if settings.OUTBOX_EAGER:
+        transaction.on_commit(
+            lambda: send(OutboxMessage.objects.filter(pk=message.pk))
+        )
+    return message
+
+
+def pending(now=None):
+    """Письма, которые пора отправить."""
+    return OutboxMessage.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=max_attempts(),
+        send_after__lte=now or timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    delay = settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=delay)
+
+
+def send(messages, connection=None):
+    """
+    Отправляет письма через одно открытое соединение connection (по
+    умолчанию — новое соединение бэкенда) и отмечает результат.
+    Возвращает (отправлено, с ошибкой).
+
+    Бэкенд SMTP открывает и закрывает соединение в каждом вызове
+    send_messages, если оно не открыто заранее, поэтому соединение
+    открывается явно. После ошибки оно закрывается и открывается снова
+    перед следующим письмом.
+    """
+    messages = list(messages)
+    if not messages:
+        return 0, 0
+    own_connection = connection is None
+    connection = connection or get_connection()
+    sent, failed = [], []
+    try:
+        for message in messages:
+            try:
+                connection.open()
+                connection.send_messages(
+                    [
+                        EmailMessage(
+                            message.subject,
+                            message.body,
+                            message.from_email,
+                            [message.recipient],
+                        )
+                    ]
+                )
+            except Exception as error:
+                connection.close()
+                message.attempts += 1
+                message.send_after = timezone.now() + retry_delay(
+                    message.attempts
+                )
+                message.last_error = repr(error)
+                if message.attempts >= max_attempts():
+                    message.body = ""
+                failed.append(message)
+            else:
+                sent.append(message.pk)
+    finally:
+        if own_connection:
+            connection.close()
+    with transaction.atomic():
+        if sent:
+            OutboxMessage.objects.filter(pk__in=sent).update(
+                sent_at=timezone.now(), last_error="", body=""
+            )
+        if failed:
+            OutboxMessage.objects.bulk_update(
+                failed, ("attempts", "send_after", "last_error", "body")
+            )
+    return len(sent), len(failed)
+
+
+def claim(batch_size):
+    """
+    Забирает очередную порцию: в короткой транзакции сдвигает send_after
+    писем на OUTBOX_LEASE секунд, чтобы другие обработчики их не взяли.
+    Если обработчик упадёт, письма снова станут готовыми после аренды.
+    Там, где СУБД умеет SKIP LOCKED, строки ещё и блокируются на время
+    этой транзакции.
+    """
+    with transaction.atomic():
+        batch = pending()
+        if db_connection.features.has_select_for_update_skip_locked:
+            batch = batch.select_for_update(skip_locked=True)
+        messages = list(batch[:batch_size])
+        OutboxMessage.objects.filter(
+            pk__in=[message.pk for message in messages]
+        ).update(
+            send_after=timezone.now()
+            + timedelta(seconds=settings.OUTBOX_LEASE)
+        )
+    return messages
+
+
+def send_batch(batch_size, connection):
+    """
+    Отправляет очередную порцию. Письма отправляются вне транзакции:
+    на SQLite открытая транзакция чтения не дала бы регистрациям
+    записывать новые письма, пока идёт отправка.
+    """
+    return send(claim(batch_size), connection)
+
+
+def purge(days=None):
+    """
+    Удаляет письма, отправленные или не отправленные за все попытки
+    больше days (по умолчанию OUTBOX_RETENTION_DAYS) дней назад.
+    Возвращает число удалённых писем.
+    """
+    if days is None:
+        days = settings.OUTBOX_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OutboxMessage.objects.filter(
+        Q(sent_at__lt=cutoff)
+        | Q(
+            sent_at__isnull=True,
+            attempts__gte=max_attempts(),
+            send_after__lt=cutoff,
+        )
+    ).delete()
+    return deleted
+
+
+def stats():
+    """
+    Размер очереди: готовы к отправке, отложены после ошибки, отправлены
+    и не отправлены за все попытки.
+    """
+    now = timezone.now()
+    unsent = Q(sent_at__isnull=True, attempts__lt=max_attempts())
+    return OutboxMessage.objects.aggregate(
+        ready=Count("pk", filter=unsent & Q(send_after__lte=now)),
+        deferred=Count("pk", filter=unsent & Q(send_after__gt=now)),
+        sent=Count("pk", filter=Q(sent_at__isnull=False)),
+        failed=Count(
+            "pk",
+            filter=Q(sent_at__isnull=True, attempts__gte=max_attempts()),
+        ),
+    )
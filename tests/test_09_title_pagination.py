@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleKeysetPagination:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Title
+
+        return [
+            Title.objects.create(
+                name=f'Произведение {idx % 4}', year=2000 + idx % 3
+            )
+            for idx in range(13)
+        ]
+
+    def walk(self, client, url):
+        ids, pages = [], []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            pages.append(data)
+            ids.extend(title['id'] for title in data['results'])
+            url = data['next']
+        return ids, pages
+
+    @pytest.mark.parametrize('ordering', ['', 'name', '-year', 'rating',
+                                          '-rating', 'year,-name'])
+    def test_01_cursor_walk_matches_ordering(self, client, user_client,
+                                             titles, ordering):
+        create_single_review(user_client, titles[3].id, 'ok', 7)
+        create_single_review(user_client, titles[5].id, 'ok', 2)
+        url = f'{self.url}?limit=4'
+        if ordering:
+            url += f'&ordering={ordering}'
+        ids, pages = self.walk(client, url)
+        expected = client.get(
+            f'{self.url}?limit=100&ordering={ordering or "name,year"}'
+        ).json()['results']
+        assert ids == [title['id'] for title in expected], (
+            'Проверьте, что переход по ссылкам `next` возвращает все '
+            'произведения в порядке сортировки без пропусков и повторов.'
+        )
+        assert pages[0]['count'] == len(titles)
+        assert pages[0]['previous'] is None
+
+        previous = client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка `previous` возвращает предыдущую страницу.'
+        )
+
+    def test_02_invalid_cursor(self, client, titles):
+        response = client.get(f'{self.url}?cursor=garbage')
+        assert response.status_code == HTTPStatus.NOT_FOUND
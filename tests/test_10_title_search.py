@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Title
+
+        names = (
+            'Крепкий орешек',
+            'Крепкий орешек 2',
+            'Ёжик в тумане',
+            'Орешек знаний тверд',
+            'Побег из Шоушенка',
+        )
+        return {
+            name: Title.objects.create(name=name, year=1990)
+            for name in names
+        }
+
+    def search(self, client, query):
+        response = client.get(self.url, {'name': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_is_case_and_yo_insensitive(self, client, titles):
+        assert set(self.search(client, 'ОРЕШ')) == {
+            'Крепкий орешек', 'Крепкий орешек 2', 'Орешек знаний тверд'
+        }, (
+            'Проверьте, что поиск по названию не зависит от регистра и '
+            'находит слова по началу.'
+        )
+        assert self.search(client, 'ежик') == ['Ёжик в тумане'], (
+            'Проверьте, что при поиске по названию `е` и `ё` не различаются.'
+        )
+        assert self.search(client, 'крепкий орешек 2') == [
+            'Крепкий орешек 2'
+        ]
+        assert self.search(client, 'терминатор') == []
+
+    def test_02_search_follows_title_changes(self, client, titles):
+        title = titles['Побег из Шоушенка']
+        title.name = 'Зелёная миля'
+        title.save()
+        assert self.search(client, 'Шоушенк') == []
+        assert self.search(client, 'зеленая') == ['Зелёная миля']
+
+        title.delete()
+        assert self.search(client, 'миля') == []
+
+    def test_03_search_with_ordering_and_pagination(self, client, titles):
+        response = client.get(
+            self.url, {'name': 'орешек', 'ordering': '-name', 'limit': 2}
+        )
+        data = response.json()
+        assert data['count'] == 3
+        names = [title['name'] for title in data['results']]
+        names += [
+            title['name']
+            for title in client.get(data['next']).json()['results']
+        ]
+        assert names == [
+            'Орешек знаний тверд', 'Крепкий орешек 2', 'Крепкий орешек'
+        ]
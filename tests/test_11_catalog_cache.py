@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CatalogCache:
+
+    def test_01_anonymous_reads_are_cached(self, client, admin_client,
+                                           django_assert_num_queries):
+        create_titles(admin_client)
+        for url in ('/api/v1/titles/', '/api/v1/genres/',
+                    '/api/v1/categories/'):
+            first = client.get(url, {'limit': 5, 'search': ''})
+            assert first.status_code == HTTPStatus.OK
+            # Для произведений остаётся только сводка для ETag.
+            with django_assert_num_queries(int(url == '/api/v1/titles/')):
+                second = client.get(url, {'search': '', 'limit': 5})
+            assert second.json() == first.json(), (
+                f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из '
+                'кэша без обращения к базе данных.'
+            )
+
+    def test_02_writes_invalidate_cache(self, client, admin_client,
+                                        user_client):
+        titles, _, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+
+        create_single_review(user_client, titles[0]['id'], 'text', 8)
+        assert client.get(url).json()['rating'] == 8, (
+            'Проверьте, что кэш произведения сбрасывается после нового '
+            'отзыва.'
+        )
+
+        admin_client.patch(url, data={'genre': [genres[2]['slug']]})
+        assert client.get(url).json()['genre'] == [genres[2]], (
+            'Проверьте, что кэш произведения сбрасывается после изменения '
+            'жанров.'
+        )
+
+        admin_client.delete(f'/api/v1/genres/{genres[0]["slug"]}/')
+        slugs = {genre['slug'] for genre in client.get(
+            '/api/v1/genres/'
+        ).json()['results']}
+        assert genres[0]['slug'] not in slugs
+
+    def test_03_other_models_keep_fast_delete(self):
+        from django.contrib.sessions.models import Session
+        from django.db.models.deletion import Collector
+
+        from reviews.models import ImportFile
+        from users.models import OutboxMessage
+
+        collector = Collector(using='default')
+        for model in (ImportFile, OutboxMessage, Session):
+            assert collector.can_fast_delete(model.objects.all()), (
+                'Проверьте, что обработчики кэша каталога подключены только '
+                'к моделям каталога и не отключают быстрое удаление '
+                f'`{model.__name__}`.'
+            )
@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    def test_01_not_modified_without_queries(self, client, admin_client,
+                                             admin, user_client, user,
+                                             django_assert_num_queries):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/',
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}'
+            '/comments/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовок ETag.'
+            )
+            assert response.has_header('Last-Modified')
+            with django_assert_num_queries(1):
+                response = client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                'If-None-Match получает ответ 304.'
+            )
+
+    def test_02_validators_change_after_write(self, client, admin_client,
+                                              user_client):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Солярис', year=1972)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+
+        create_single_review(user_client, title.id, 'text', 9)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления отзыва ETag списка отзывов '
+            'меняется.'
+        )
+        assert response['ETag'] != etag
+        assert len(response.json()['results']) == 1
+
+    def test_03_deleted_parent_is_not_modified(self, client, admin_client,
+                                               user_client):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Солярис', year=1972)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+        title.delete()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что после удаления произведения запрос к его '
+            'отзывам с прежним ETag не получает ответ 304.'
+        )
+
+        title = Title.objects.create(name='Сталкер', year=1979)
+        review = create_single_review(user_client, title.id, 'text', 9)
+        review_url = (
+            f'/api/v1/titles/{title.id}/reviews/{review.json()["id"]}/'
+        )
+        etag = client.get(f'{review_url}comments/')['ETag']
+        user_client.delete(review_url)
+        url = f'{review_url}comments/'
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что после удаления отзыва запрос к его '
+            'комментариям с прежним ETag не получает ответ 304.'
+        )
+
+    def test_04_validators_follow_resource_data(self, client, admin_client,
+                                                user_client):
+        from django.core.cache import caches
+
+        from reviews.models import Title
+
+        title, other = (
+            Title.objects.create(name=name, year=1972)
+            for name in ('Солярис', 'Сталкер')
+        )
+        review = create_single_review(user_client, title.id, 'text', 9)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        etag = client.get(url)['ETag']
+
+        client.post('/api/v1/auth/signup/', data={
+            'email': 'new@yamdb.fake', 'username': 'newcomer'
+        })
+        admin_client.post(
+            f'/api/v1/titles/{other.id}/reviews/',
+            data={'text': 'other', 'score': 5},
+        )
+        for cache in caches.all():
+            cache.clear()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что ETag списка отзывов выводится из его данных и не '
+            'меняется от посторонних записей и в другом процессе.'
+        )
+
+        user_client.patch(
+            f'{url}{review.json()["id"]}/', data={'text': 'new text'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag списка отзывов меняется при изменении '
+            'текста отзыва.'
+        )
+        assert response.json()['results'][0]['text'] == 'new text'
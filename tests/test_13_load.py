@@ -0,0 +1,162 @@
+import csv
+import os
+import shutil
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Avg
+
+from tests.conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'reviews', 'management', 'data')
+
+
+def csv_rows(name):
+    with open(os.path.join(DATA_PATH, f'{name}.csv'), encoding='utf-8',
+              newline='') as data:
+        return list(csv.DictReader(data))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13LoadCommand:
+
+    def test_01_load_all_files(self, django_assert_max_num_queries):
+        from reviews.models import (Category, Comment, Genre, GenreTitle,
+                                    Review, Title)
+        from users.models import User
+
+        with django_assert_max_num_queries(70):
+            call_command('load', path=DATA_PATH)
+
+        expected = {
+            Category: 'category', Genre: 'genre', Title: 'titles',
+            User: 'users', Review: 'review', Comment: 'comments',
+            GenreTitle: 'genre_title',
+        }
+        for model, name in expected.items():
+            assert model.objects.count() == len(csv_rows(name)), (
+                f'Проверьте, что команда `load` загружает все строки '
+                f'файла `{name}.csv`.'
+            )
+        row = csv_rows('review')[0]
+        review = Review.objects.get(pk=row['id'])
+        assert review.author_id == int(row['author'])
+        assert review.title_id == int(row['title_id'])
+
+        for title in Title.objects.annotate(avg=Avg('reviews__score')):
+            assert title.rating == title.avg, (
+                'Проверьте, что после загрузки рейтинг произведений '
+                'пересчитан.'
+            )
+
+    @pytest.mark.parametrize('chunk_bytes', [1, 97, 1000, 10 ** 6])
+    def test_02_byte_ranges_follow_csv_records(self, chunk_bytes):
+        from reviews import importer
+        from reviews.models import Review
+
+        path = os.path.join(DATA_PATH, 'review.csv')
+        with open(path, encoding='utf-8', newline='') as data:
+            reader = csv.reader(data)
+            columns = importer.get_columns(Review, next(reader))
+            expected = importer.parse_rows(Review, columns, reader)
+        parsed = []
+        for start, end in importer.split_ranges(path, chunk_bytes):
+            parsed += importer.parse_range(
+                Review._meta.label, columns, path, start, end
+            )
+        assert parsed == expected, (
+            'Проверьте, что деление файла на диапазоны байтов не разрывает '
+            'записи CSV с переводами строк внутри кавычек.'
+        )
+
+    def test_03_load_with_workers(self, monkeypatch):
+        from reviews.management.commands import load
+        from reviews.models import Comment, Review
+
+        monkeypatch.setattr(load, 'CHUNK_BYTES', 500)
+        call_command('load', path=DATA_PATH, workers=2)
+        assert Review.objects.count() == len(csv_rows('review'))
+        assert Comment.objects.count() == len(csv_rows('comments'))
+        first = csv_rows('review')[0]
+        assert Review.objects.get(pk=first['id']).text == first['text']
+
+    def test_04_upsert_is_idempotent_and_incremental(
+        self, tmp_path, django_assert_max_num_queries
+    ):
+        from reviews.models import GenreTitle, ImportFile, Review, Title
+
+        data_path = tmp_path / 'data'
+        shutil.copytree(DATA_PATH, data_path)
+        call_command('load', path=str(data_path), upsert=True)
+        call_command('load', path=str(data_path), upsert=True)
+        assert GenreTitle.objects.count() == len(csv_rows('genre_title')), (
+            'Проверьте, что повторный запуск `load --upsert` не дублирует '
+            'строки.'
+        )
+        assert ImportFile.objects.count() == 7
+
+        rows = csv_rows('review')
+        rows[0]['score'] = '1'
+        rows[0]['text'] = 'Передумал'
+        with open(data_path / 'review.csv', 'w', encoding='utf-8',
+                  newline='') as data:
+            writer = csv.DictWriter(data, fieldnames=rows[0].keys())
+            writer.writeheader()
+            writer.writerows(rows)
+        with django_assert_max_num_queries(28):
+            call_command('load', path=str(data_path), upsert=True)
+        review = Review.objects.get(pk=rows[0]['id'])
+        assert (review.score, review.text) == (1, 'Передумал')
+        assert Review.objects.count() == len(rows)
+        title = Title.objects.get(pk=review.title_id)
+        scores = list(title.reviews.values_list('score', flat=True))
+        assert title.rating == sum(scores) / len(scores)
+
+    def test_05_resume_after_crash(self, monkeypatch):
+        from reviews.management.commands import load
+        from reviews.models import Comment, ImportFile, Review
+
+        monkeypatch.setattr(load, 'CHUNK_BYTES', 500)
+        write_chunk = load.Command.write_chunk
+        calls = []
+
+        def crashing_write_chunk(self, model, columns, chunk):
+            if model is Review:
+                calls.append(len(chunk))
+                if len(calls) == 3:
+                    raise RuntimeError('crash')
+            return write_chunk(self, model, columns, chunk)
+
+        monkeypatch.setattr(load.Command, 'write_chunk', crashing_write_chunk)
+        with pytest.raises(RuntimeError):
+            call_command('load', path=DATA_PATH, resume=True)
+        journal = ImportFile.objects.get(name='review')
+        assert not journal.finished
+        assert journal.rows == Review.objects.count() == sum(calls[:2]), (
+            'Проверьте, что при `--resume` каждая порция фиксируется '
+            'вместе с журналом загрузки.'
+        )
+
+        monkeypatch.setattr(load.Command, 'write_chunk', write_chunk)
+        call_command('load', path=DATA_PATH, resume=True)
+        assert Review.objects.count() == len(csv_rows('review')), (
+            'Проверьте, что `load --resume` продолжает загрузку с последней '
+            'зафиксированной порции без дублей и пропусков.'
+        )
+        assert Comment.objects.count() == len(csv_rows('comments'))
+        assert ImportFile.objects.filter(finished=False).count() == 0
+
+    def test_06_empty_file_is_skipped(self, tmp_path):
+        from reviews.models import Genre, ImportFile
+
+        data_path = tmp_path / 'data'
+        shutil.copytree(DATA_PATH, data_path)
+        (data_path / 'category.csv').write_text('', encoding='utf-8')
+        call_command('load', path=str(data_path))
+        assert Genre.objects.count() == len(csv_rows('genre')), (
+            'Проверьте, что пустой файл пропускается, а остальные файлы '
+            'загружаются.'
+        )
+        assert not ImportFile.objects.filter(
+            name='category', finished=True
+        ).exists()
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import math
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.test_13_load import DATA_PATH, csv_rows
+
+
+def without_date(rows):
+    return [
+        {key: value for key, value in row.items() if key != 'pub_date'}
+        for row in rows
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Export:
+    url = '/api/v1/export/'
+
+    @pytest.fixture
+    def catalog(self):
+        call_command('load', path=DATA_PATH)
+
+    def test_01_dump_csv_matches_load_layout(self, catalog, tmp_path):
+        from reviews import importer
+        from reviews.models import Review
+
+        call_command('dump', path=str(tmp_path), chunk_size=7)
+        for name in ('titles', 'genre_title', 'comments'):
+            with open(tmp_path / f'{name}.csv', encoding='utf-8',
+                      newline='') as data:
+                dumped = list(csv.DictReader(data))
+            assert without_date(dumped) == without_date(csv_rows(name)), (
+                f'Проверьте, что `dump` выгружает `{name}.csv` в той же '
+                'раскладке, что и файлы для `load`.'
+            )
+
+        with open(tmp_path / 'review.csv', encoding='utf-8',
+                  newline='') as data:
+            reader = csv.reader(data)
+            columns = importer.get_columns(Review, next(reader))
+            parsed = importer.parse_rows(Review, columns, reader)
+        assert len(parsed) == Review.objects.count()
+        first = Review.objects.order_by('pk').first()
+        assert parsed[0]['pub_date'] == first.pub_date, (
+            'Проверьте, что выгруженный CSV снова разбирается командой '
+            '`load`.'
+        )
+
+    def test_02_ndjson_titles_reads_in_chunks(
+        self, catalog, django_assert_max_num_queries
+    ):
+        from reviews import exporter
+        from reviews.models import Title
+
+        count = Title.objects.count()
+        with django_assert_max_num_queries(1 + math.ceil(count / 5)):
+            text = ''.join(exporter.export('titles', 'ndjson', chunk_size=5))
+        records = [json.loads(line) for line in text.splitlines()]
+        assert len(records) == count
+        title = Title.objects.get(pk=records[0]['id'])
+        assert records[0]['rating'] == title.rating
+        assert records[0]['category'] == title.category.slug
+        assert records[0]['genre'] == sorted(
+            title.genre.values_list('slug', flat=True)
+        ), (
+            'Проверьте, что в NDJSON у произведения есть слаги жанров и '
+            'категории.'
+        )
+
+    def test_03_export_endpoint(self, catalog, client, user_client,
+                                admin_client):
+        response = client.get(f'{self.url}review.csv')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.get(f'{self.url}review.csv')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что выгрузка каталога доступна только '
+            'администратору.'
+        )
+        response = admin_client.get(f'{self.url}unknown.csv')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        response = admin_client.get(f'{self.url}review.csv')
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоком '
+            '(`StreamingHttpResponse`).'
+        )
+        text = b''.join(response.streaming_content).decode('utf-8')
+        dumped = list(csv.DictReader(io.StringIO(text, newline='')))
+        assert sorted(row['id'] for row in dumped) == sorted(
+            row['id'] for row in csv_rows('review')
+        )
+
+        response = admin_client.get(f'{self.url}comments.ndjson')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        records = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert len(records) == len(csv_rows('comments'))
+        assert response['Content-Disposition'] == (
+            'attachment; filename="comments.ndjson"'
+        )
@@ -0,0 +1,198 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Outbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.fixture(autouse=True)
+    def deferred_outbox(self, settings):
+        settings.OUTBOX_EAGER = False
+
+    def signup(self, client, number):
+        data = {
+            'email': f'user{number}@yamdb.fake',
+            'username': f'user{number}',
+        }
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == HTTPStatus.OK
+        return data
+
+    def test_01_signup_enqueues_and_worker_sends(self, client, monkeypatch):
+        from users.models import OutboxMessage
+
+        signups = [self.signup(client, number) for number in range(3)]
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо сама, а ставит '
+            'его в очередь.'
+        )
+        assert OutboxMessage.objects.filter(sent_at__isnull=True).count() == 3
+
+        # Бэкенд ведёт себя как SMTP: send_messages без открытого
+        # соединения открывает его и закрывает после отправки.
+        opened = []
+        send_messages = locmem.EmailBackend.send_messages
+
+        def smtp_open(backend):
+            if getattr(backend, 'is_open', False):
+                return False
+            backend.is_open = True
+            opened.append(backend)
+            return True
+
+        def smtp_close(backend):
+            backend.is_open = False
+
+        def smtp_send_messages(backend, messages):
+            assert not connection.in_atomic_block, (
+                'Проверьте, что письма отправляются вне транзакции.'
+            )
+            new_connection = smtp_open(backend)
+            try:
+                return send_messages(backend, messages)
+            finally:
+                if new_connection:
+                    smtp_close(backend)
+
+        monkeypatch.setattr(locmem.EmailBackend, 'open', smtp_open)
+        monkeypatch.setattr(locmem.EmailBackend, 'close', smtp_close)
+        monkeypatch.setattr(
+            locmem.EmailBackend, 'send_messages', smtp_send_messages
+        )
+        call_command('send_outbox', once=True, batch_size=2)
+        assert [message.to for message in mail.outbox] == [
+            [data['email']] for data in signups
+        ], 'Проверьте, что `send_outbox` отправляет письма из очереди.'
+        assert len(opened) == 1, (
+            'Проверьте, что `send_outbox` открывает соединение почтового '
+            'бэкенда один раз и отправляет через него все письма.'
+        )
+        assert OutboxMessage.objects.filter(sent_at__isnull=True).count() == 0
+
+        call_command('send_outbox', once=True)
+        assert len(mail.outbox) == 3
+
+    def test_02_failed_message_is_retried_with_backoff(self, client,
+                                                       monkeypatch):
+        from users import outbox
+        from users.models import OutboxMessage
+
+        self.signup(client, 1)
+        send_messages = locmem.EmailBackend.send_messages
+
+        def broken_send_messages(backend, messages):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(
+            locmem.EmailBackend, 'send_messages', broken_send_messages
+        )
+        before = timezone.now()
+        call_command('send_outbox', once=True)
+        message = OutboxMessage.objects.get()
+        assert message.sent_at is None
+        assert message.attempts == 1
+        assert message.send_after > before, (
+            'Проверьте, что письмо после ошибки отправки откладывается.'
+        )
+        assert 'SMTP недоступен' in message.last_error
+        assert outbox.stats() == {
+            'ready': 0, 'deferred': 1, 'sent': 0, 'failed': 0
+        }
+
+        monkeypatch.setattr(
+            locmem.EmailBackend, 'send_messages', send_messages
+        )
+        call_command('send_outbox', once=True)
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что отложенное письмо не отправляется раньше срока.'
+        )
+        OutboxMessage.objects.update(
+            send_after=timezone.now() - timedelta(seconds=1)
+        )
+        call_command('send_outbox', once=True)
+        assert len(mail.outbox) == 1
+        assert outbox.stats()['sent'] == 1
+
+    def test_03_attempts_are_limited(self, client, monkeypatch, settings):
+        from users import outbox
+        from users.models import OutboxMessage
+
+        settings.OUTBOX_MAX_ATTEMPTS = 2
+        settings.OUTBOX_RETRY_DELAY = 0
+        self.signup(client, 1)
+
+        def broken_send_messages(backend, messages):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(
+            locmem.EmailBackend, 'send_messages', broken_send_messages
+        )
+        for _ in range(3):
+            call_command('send_outbox', once=True)
+        assert OutboxMessage.objects.get().attempts == 2, (
+            'Проверьте, что число попыток отправки письма ограничено '
+            '`OUTBOX_MAX_ATTEMPTS`.'
+        )
+        assert outbox.stats()['failed'] == 1
+
+    def test_04_batch_is_claimed_before_sending(self, client, settings):
+        from users import outbox
+        from users.models import OutboxMessage
+
+        settings.OUTBOX_LEASE = 600
+        for number in range(3):
+            self.signup(client, number)
+        claimed = outbox.claim(2)
+        assert len(claimed) == 2
+        assert outbox.pending().count() == 1, (
+            'Проверьте, что забранная порция откладывается на время '
+            'аренды и не достаётся другому обработчику.'
+        )
+        assert outbox.send(claimed) == (2, 0)
+        assert OutboxMessage.objects.filter(sent_at__isnull=True).count() == 1
+
+    def test_05_old_messages_are_purged(self, client, monkeypatch, settings):
+        from users import outbox
+        from users.models import OutboxMessage
+
+        settings.OUTBOX_MAX_ATTEMPTS = 1
+        for number in range(3):
+            self.signup(client, number)
+        first, second, third = OutboxMessage.objects.order_by('id')
+
+        def broken_send_messages(backend, messages):
+            raise ConnectionError('SMTP недоступен')
+
+        outbox.send([first])
+        monkeypatch.setattr(
+            locmem.EmailBackend, 'send_messages', broken_send_messages
+        )
+        outbox.send([second])
+        bodies = OutboxMessage.objects.order_by('id').values_list(
+            'body', flat=True
+        )
+        assert list(bodies) == ['', '', third.body], (
+            'Проверьте, что текст письма с кодом подтверждения стирается '
+            'после отправки и после последней неудачной попытки.'
+        )
+
+        old = timezone.now() - timedelta(
+            days=settings.OUTBOX_RETENTION_DAYS + 1
+        )
+        OutboxMessage.objects.filter(pk=first.pk).update(sent_at=old)
+        OutboxMessage.objects.filter(pk=second.pk).update(send_after=old)
+        call_command('send_outbox', once=True)
+        assert list(
+            OutboxMessage.objects.values_list('pk', flat=True)
+        ) == [third.pk], (
+            'Проверьте, что `send_outbox` удаляет отправленные и не '
+            'отправленные письма старше `OUTBOX_RETENTION_DAYS` дней.'
+        )
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ConfirmationCode:
+
+    def test_01_signup_writes_user_once(self, client, django_user_model):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                '/api/v1/auth/signup/',
+                data={'email': 'once@yamdb.fake', 'username': 'once'},
+            )
+        assert response.status_code == HTTPStatus.OK
+        user_writes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE'))
+            and 'users_user' in query['sql']
+        ]
+        assert len(user_writes) == 1, (
+            'Проверьте, что при регистрации пользователь записывается в '
+            'базу одним запросом, вместе с кодом подтверждения.'
+        )
+        user = django_user_model.objects.get(username='once')
+        assert user.confirmation_code != 'XXXX'
+
+    def test_02_bulk_created_users_get_codes(self, django_user_model):
+        users = django_user_model.objects.bulk_create(
+            django_user_model(username=f'bulk{number}',
+                              email=f'bulk{number}@yamdb.fake')
+            for number in range(5)
+        )
+        codes = set(
+            django_user_model.objects.values_list(
+                'confirmation_code', flat=True
+            )
+        )
+        assert len(codes) == len(users) and 'XXXX' not in codes, (
+            'Проверьте, что пользователи, созданные через `bulk_create`, '
+            'получают собственный код подтверждения.'
+        )
+
+    def test_03_backfill_command(self, django_user_model):
+        django_user_model.objects.bulk_create(
+            django_user_model(username=f'old{number}',
+                              email=f'old{number}@yamdb.fake',
+                              confirmation_code='XXXX')
+            for number in range(5)
+        )
+        call_command('backfill_confirmation_codes', batch_size=2)
+        codes = list(
+            django_user_model.objects.values_list(
+                'confirmation_code', flat=True
+            )
+        )
+        assert 'XXXX' not in codes and len(set(codes)) == 5, (
+            'Проверьте, что `backfill_confirmation_codes` заполняет код у '
+            'всех пользователей без него.'
+        )
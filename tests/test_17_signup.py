@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+
+
+def user_queries(context):
+    return [
+        query['sql'].split()[0] for query in context.captured_queries
+        if '"users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Signup:
+    url = '/api/v1/auth/signup/'
+    data = {'email': 'race@yamdb.fake', 'username': 'race'}
+
+    def signup(self, client, data):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url, data=data)
+        return response, user_queries(context)
+
+    def test_01_signup_queries(self, client):
+        response, queries = self.signup(client, self.data)
+        assert response.status_code == HTTPStatus.OK
+        assert queries == ['SELECT', 'INSERT'], (
+            'Проверьте, что регистрация нового пользователя выполняет один '
+            'запрос на проверку и один на вставку.'
+        )
+
+        response, queries = self.signup(client, self.data)
+        assert response.status_code == HTTPStatus.OK
+        assert queries == ['SELECT'], (
+            'Проверьте, что повторная регистрация с теми же данными '
+            'обходится одним запросом к таблице пользователей.'
+        )
+
+        response, queries = self.signup(
+            client, {**self.data, 'email': 'other@yamdb.fake'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert queries == ['SELECT']
+
+    def test_02_constraints_decide_concurrent_signups(self,
+                                                      django_user_model):
+        from api.serializer import SignUpSerializer
+        from api_yamdb import constances
+
+        first = SignUpSerializer(data=self.data)
+        second = SignUpSerializer(
+            data={**self.data, 'email': 'second@yamdb.fake'}
+        )
+        same = SignUpSerializer(data=self.data)
+        assert first.is_valid() and second.is_valid() and same.is_valid()
+
+        user = first.save()
+        with pytest.raises(ValidationError) as error:
+            second.save()
+        assert constances.USERNAME_TAKEN_ERROR in str(error.value), (
+            'Проверьте, что при одновременной регистрации с тем же `username` '
+            'второй запрос получает ошибку, а не 500.'
+        )
+        assert same.save() == user, (
+            'Проверьте, что одновременная регистрация с теми же данными '
+            'возвращает уже созданного пользователя.'
+        )
+        assert django_user_model.objects.count() == 1
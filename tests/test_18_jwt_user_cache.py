@@ -0,0 +1,145 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def user_selects(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18JWTUserCache:
+    url_me = '/api/v1/users/me/'
+
+    def test_01_user_is_read_once(self, user_client):
+        response, queries = user_selects(user_client, self.url_me)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 1
+
+        response, queries = user_selects(user_client, self.url_me)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['username'] == 'TestUser'
+        assert queries == [], (
+            'Проверьте, что пользователь из JWT-токена кэшируется и не '
+            'читается из базы на каждый запрос.'
+        )
+
+    def test_02_role_change_is_visible_at_once(self, user_client,
+                                               admin_client, user):
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что изменение роли пользователя сбрасывает его '
+            'запись в кэше аутентификации.'
+        )
+
+    def test_03_deleted_user_is_rejected(self, user_client, user):
+        assert user_client.get(self.url_me).status_code == HTTPStatus.OK
+        user.delete()
+        assert user_client.get(self.url_me).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что удалённый пользователь не проходит '
+            'аутентификацию по закэшированной записи.'
+        )
+
+    @pytest.fixture
+    def token_auth(self):
+        from api.authentication import (VerifiedTokenJWTAuthentication,
+                                        verified_tokens)
+
+        verified_tokens.clear()
+        yield VerifiedTokenJWTAuthentication()
+        verified_tokens.clear()
+
+    def authenticate(self, auth, token):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+
+        request = APIRequestFactory().get(
+            self.url_me, HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        return auth.authenticate(Request(request))
+
+    def test_04_verified_token_is_not_decoded_again(
+        self, token_auth, token_user, user, monkeypatch
+    ):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        decoded = []
+        init = AccessToken.__init__
+
+        def counting_init(token, *args, **kwargs):
+            decoded.append(token)
+            init(token, *args, **kwargs)
+
+        monkeypatch.setattr(AccessToken, '__init__', counting_init)
+        for _ in range(3):
+            authenticated, _ = self.authenticate(
+                token_auth, token_user['access']
+            )
+            assert authenticated == user
+        assert len(decoded) == 1, (
+            'Проверьте, что `VerifiedTokenJWTAuthentication` проверяет '
+            'подпись токена один раз.'
+        )
+
+    def test_05_cached_token_honors_exp(self, token_auth, token_user,
+                                        monkeypatch):
+        import time
+        from datetime import datetime, timezone
+
+        from rest_framework_simplejwt import tokens
+        from rest_framework_simplejwt.exceptions import InvalidToken
+
+        self.authenticate(token_auth, token_user['access'])
+        expired = tokens.AccessToken(token_user['access'])['exp'] + 1
+        monkeypatch.setattr(time, 'time', lambda: expired)
+        monkeypatch.setattr(
+            tokens, 'aware_utcnow',
+            lambda: datetime.fromtimestamp(expired, timezone.utc)
+        )
+        with pytest.raises(InvalidToken):
+            self.authenticate(token_auth, token_user['access'])
+
+    def test_06_cache_is_bounded(self, user, admin):
+        from api.authentication import VerifiedTokenCache
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        cache = VerifiedTokenCache(max_size=1)
+        cache.set(b'user', AccessToken.for_user(user))
+        cache.set(b'admin', AccessToken.for_user(admin))
+        assert cache.get(b'user') is None
+        assert cache.get(b'admin')['user_id'] == admin.id
+
+    def test_07_writes_use_fresh_user(self, user_client, user):
+        from users.models import User
+
+        User.objects.filter(pk=user.pk).update(role='admin')
+        assert user_client.get(self.url_me).json()['role'] == 'admin'
+        # Понижение роли в другом процессе: кэш этого процесса не
+        # сбрасывается.
+        User.objects.filter(pk=user.pk).update(role='user')
+        response = user_client.patch(self.url_me, data={'first_name': 'Ян'})
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.role == 'user', (
+            'Проверьте, что запросы на изменение читают пользователя из '
+            'базы, а не из кэша аутентификации.'
+        )
+        assert user.first_name == 'Ян'
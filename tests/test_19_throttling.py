@@ -0,0 +1,123 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19AuthThrottling:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+
+    @pytest.fixture
+    def rates(self, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                'auth_ip': '3/min', 'auth_username': '2/min'
+            },
+        }
+
+    def signup(self, client, number, ip='10.0.0.1'):
+        return client.post(
+            self.url_signup,
+            data={
+                'email': f'user{number}@yamdb.fake',
+                'username': f'user{number}',
+            },
+            REMOTE_ADDR=ip,
+        )
+
+    def test_01_signup_is_limited_per_ip(self, client, rates):
+        for number in range(3):
+            assert self.signup(client, number).status_code == HTTPStatus.OK
+        response = self.signup(client, 3)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что число запросов к регистрации с одного IP '
+            'ограничено.'
+        )
+        assert int(response['Retry-After']) > 0
+        assert self.signup(client, 3, ip='10.0.0.2').status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_02_token_is_limited_per_username(self, client, rates):
+        data = {'username': 'victim', 'confirmation_code': 'wrong'}
+        for number in range(2):
+            response = client.post(
+                self.url_token, data=data, REMOTE_ADDR=f'10.0.1.{number}'
+            )
+            assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.post(self.url_token, data=data,
+                               REMOTE_ADDR='10.0.1.9')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подбор кода для одного `username` ограничен '
+            'независимо от IP.'
+        )
+        response = client.post(
+            self.url_token, data={**data, 'username': 'other'},
+            REMOTE_ADDR='10.0.1.9'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_bucket_refills_over_time(self, client, rates, monkeypatch):
+        from api.throttling import TokenBucketThrottle
+
+        now = [1000.0]
+        monkeypatch.setattr(TokenBucketThrottle, 'timer', lambda self: now[0])
+        for number in range(3):
+            assert self.signup(client, number).status_code == HTTPStatus.OK
+        assert self.signup(client, 3).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+        now[0] += 20
+        assert self.signup(client, 3).status_code == HTTPStatus.OK, (
+            'Проверьте, что ведро пополняется со временем: при 3/min '
+            'новый запрос доступен через 20 секунд.'
+        )
+        assert self.signup(client, 4).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+
+    def test_04_forwarded_for_is_not_trusted(self, client, rates):
+        for number in range(4):
+            response = client.post(
+                self.url_signup,
+                data={
+                    'email': f'user{number}@yamdb.fake',
+                    'username': f'user{number}',
+                },
+                REMOTE_ADDR='10.0.0.1',
+                HTTP_X_FORWARDED_FOR=f'192.168.0.{number}',
+            )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что ограничение по IP нельзя обойти, подставляя '
+            'разные заголовки X-Forwarded-For.'
+        )
+
+    def test_05_trusted_proxy_address(self, client, rates, settings):
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        for number in range(4):
+            response = client.post(
+                self.url_signup,
+                data={
+                    'email': f'user{number}@yamdb.fake',
+                    'username': f'user{number}',
+                },
+                REMOTE_ADDR='10.0.0.1',
+                HTTP_X_FORWARDED_FOR=f'spoofed, 192.168.0.{number}',
+            )
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что за доверенным прокси IP клиента берётся из '
+                'записи прокси в X-Forwarded-For.'
+            )
+
+    @pytest.mark.parametrize('body', ['[1, 2]', '"user"', 'null'])
+    def test_06_non_object_body(self, client, rates, body):
+        for url in (self.url_signup, self.url_token):
+            response = client.post(
+                url, data=body, content_type='application/json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{url}` отвечает 400, а не 500, если тело '
+                'запроса — не JSON-объект.'
+            )
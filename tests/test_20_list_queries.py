@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, url
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ListQueries:
+
+    @pytest.fixture
+    def catalog(self, django_user_model):
+        from reviews.models import Category, Genre, Title
+
+        category = Category.objects.create(name='Фильм', slug='film')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        title.genre.add(genre)
+        return title
+
+    def fill(self, django_user_model, title, start, stop):
+        """Добавляет отзывы и комментарии от разных авторов."""
+        from reviews.models import Category, Comment, Genre, Review, Title
+
+        review = None
+        for number in range(start, stop):
+            author = django_user_model.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            review = Review.objects.create(title=title, author=author,
+                                           text='Отзыв', score=5)
+            Comment.objects.create(review=title.reviews.earliest('pk'),
+                                   author=author, text='Комментарий')
+            Category.objects.create(name=f'Категория {number}',
+                                    slug=f'category{number}')
+            Genre.objects.create(name=f'Жанр {number}',
+                                 slug=f'genre{number}')
+            other = Title.objects.create(name=f'Фильм {number}', year=2000,
+                                         category=title.category)
+            other.genre.add(*title.genre.all())
+        return review
+
+    def test_01_list_queries_do_not_grow_with_page(
+        self, client, admin_client, django_user_model, catalog
+    ):
+        self.fill(django_user_model, catalog, 0, 2)
+        review = catalog.reviews.earliest('pk')
+        urls = {
+            client: (
+                '/api/v1/categories/',
+                '/api/v1/genres/',
+                '/api/v1/titles/',
+                f'/api/v1/titles/{catalog.id}/reviews/',
+                f'/api/v1/titles/{catalog.id}/reviews/{review.id}/comments/',
+            ),
+            admin_client: ('/api/v1/users/',),
+        }
+        # Первый запрос клиента кладёт пользователя из токена в кэш.
+        admin_client.get('/api/v1/users/me/')
+        small = {
+            url: count_queries(user_client, url)
+            for user_client, client_urls in urls.items()
+            for url in client_urls
+        }
+        self.fill(django_user_model, catalog, 2, 8)
+        for user_client, client_urls in urls.items():
+            for url in client_urls:
+                assert count_queries(user_client, url) == small[url], (
+                    f'Проверьте, что число запросов к базе для списка `{url}` '
+                    'не растёт с числом объектов на странице.'
+                )
+
+    def test_02_review_and_comment_lists_join_authors(
+        self, client, django_user_model, catalog
+    ):
+        self.fill(django_user_model, catalog, 0, 5)
+        review = catalog.reviews.earliest('pk')
+        for url in (
+            f'/api/v1/titles/{catalog.id}/reviews/',
+            f'/api/v1/titles/{catalog.id}/reviews/{review.id}/comments/',
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert len(response.json()['results']) == 5
+            user_queries = [
+                query['sql'] for query in context.captured_queries
+                if query['sql'].startswith('SELECT')
+                and 'FROM "users_user"' in query['sql']
+            ]
+            assert user_queries == [], (
+                f'Проверьте, что список `{url}` получает авторов тем же '
+                'запросом (`select_related`), а не отдельным запросом на '
+                'каждую строку.'
+            )
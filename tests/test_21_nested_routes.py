@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def table_selects(context, table):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21NestedRoutes:
+
+    @pytest.fixture
+    def reviews(self, admin, user):
+        from reviews.models import Review, Title
+
+        first = Title.objects.create(name='Первый', year=2000)
+        second = Title.objects.create(name='Второй', year=2000)
+        return (
+            Review.objects.create(title=first, author=admin, text='Да',
+                                  score=8),
+            Review.objects.create(title=second, author=user, text='Нет',
+                                  score=2),
+        )
+
+    def test_01_comment_routes_check_review_title(self, client, user_client,
+                                                  reviews):
+        review, other = reviews
+        wrong = f'/api/v1/titles/{other.title_id}/reviews/{review.id}/'
+        right = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        assert client.get(f'{right}comments/').status_code == HTTPStatus.OK
+        assert client.get(f'{wrong}comments/').status_code == (
+            HTTPStatus.NOT_FOUND
+        ), (
+            'Проверьте, что комментарии недоступны по адресу с `title_id` '
+            'другого произведения.'
+        )
+        response = user_client.post(f'{wrong}comments/', data={'text': 'А'})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что нельзя добавить комментарий к отзыву по адресу '
+            'с `title_id` другого произведения.'
+        )
+        response = user_client.post(f'{right}comments/', data={'text': 'А'})
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_02_parent_is_resolved_once(self, client, user_client, reviews):
+        review, _ = reviews
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}{review.id}/comments/')
+        assert response.status_code == HTTPStatus.OK
+        assert len(table_selects(context, 'reviews_review')) == 1, (
+            'Проверьте, что цепочка `title_id`/`review_id` проверяется '
+            'одним запросом.'
+        )
+        assert len(context.captured_queries) <= 3
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                f'{url}{review.id}/comments/', data={'text': 'Комментарий'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(table_selects(context, 'reviews_review')) == 1, (
+            'Проверьте, что родительский объект читается один раз за '
+            'запрос, в том числе при создании.'
+        )
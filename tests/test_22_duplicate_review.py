@@ -0,0 +1,40 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22DuplicateReview:
+
+    def test_01_duplicate_is_rejected_by_constraint(self, user_client, user):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Фильм', year=2000)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Да', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert not [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ], (
+            'Проверьте, что перед созданием отзыва не выполняется '
+            'отдельный запрос на проверку дубликата.'
+        )
+
+        response = user_client.post(url, data={'text': 'Нет', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': ['Запрещено добавлять второй отзыв.']
+        }, (
+            'Проверьте, что повторный отзыв отклоняется с прежним '
+            'сообщением об ошибке.'
+        )
+        assert Review.objects.filter(title=title).count() == 1
+        title.refresh_from_db()
+        assert title.rating == 7, (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг.'
+        )
@@ -0,0 +1,36 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23AuthorPermission:
+
+    def check(self, user, obj, method='patch'):
+        from api.permissions import IsAuthorOrReadOnly
+
+        request = Request(getattr(APIRequestFactory(), method)('/'))
+        request.user = user
+        return IsAuthorOrReadOnly().has_object_permission(request, None, obj)
+
+    def test_01_permission_does_not_load_author(
+        self, user, admin, moderator, django_user_model,
+        django_assert_num_queries
+    ):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Фильм', year=2000)
+        Review.objects.create(title=title, author=user, text='Да', score=5)
+        other = django_user_model.objects.create(
+            username='other', email='other@yamdb.fake'
+        )
+        review = Review.objects.only('id', 'author_id').get()
+        with django_assert_num_queries(0):
+            assert self.check(user, review)
+            assert self.check(admin, review)
+            assert self.check(moderator, review, method='delete')
+            assert not self.check(other, review), (
+                'Проверьте, что изменять отзыв может только автор, '
+                'модератор или администратор.'
+            )
+            assert self.check(other, review, method='get')
@@ -0,0 +1,39 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24YearFilter:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Title
+
+        for year in (1957, 1966, 1989, 1997):
+            Title.objects.create(name=f'Фильм {year}', year=year)
+
+    def years(self, client, params):
+        response = client.get(self.url, params)
+        assert response.status_code == HTTPStatus.OK
+        return sorted(title['year'] for title in response.json()['results'])
+
+    def test_01_exact_and_range(self, client, titles):
+        assert self.years(client, {'year': 1966}) == [1966]
+        assert self.years(client, {'year_min': 1966}) == [1966, 1989, 1997]
+        assert self.years(client, {'year_max': 1989}) == [1957, 1966, 1989]
+        assert self.years(
+            client, {'year_min': 1960, 'year_max': 1990}
+        ) == [1966, 1989], (
+            'Проверьте, что `year_min` и `year_max` задают диапазон лет '
+            'включительно.'
+        )
+
+    def test_02_invalid_year(self, client, titles):
+        response = client.get(self.url, {'year': 'дветыщи'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(self.url, {'year_min': '1957.5'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что год в фильтре должен быть целым числом.'
+        )
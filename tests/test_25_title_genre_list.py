@@ -0,0 +1,159 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.test_13_load import DATA_PATH
+
+
+def genres(title):
+    return sorted(
+        title.genre.values('name', 'slug'), key=lambda genre: genre['name']
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TitleGenreList:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def genre_objects(self):
+        from reviews.models import Category, Genre
+
+        Category.objects.create(name='Фильм', slug='film')
+        return [
+            Genre.objects.create(name=name, slug=slug)
+            for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'),
+                               ('Боевик', 'action'))
+        ]
+
+    def test_01_list_page_does_not_query_genres(self, client, admin_client,
+                                                genre_objects):
+        for number in range(3):
+            response = admin_client.post(self.url, data={
+                'name': f'Фильм {number}', 'year': 2000,
+                'category': 'film', 'genre': ['drama', 'comedy'],
+            })
+            assert response.status_code == HTTPStatus.CREATED
+            assert [genre['slug'] for genre in response.json()['genre']] == [
+                'drama', 'comedy'
+            ]
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'][0]['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ]
+        assert not [
+            query for query in context.captured_queries
+            if 'reviews_genre' in query['sql']
+        ], (
+            'Проверьте, что список произведений отдаёт жанры из хранимого '
+            'поля, без запросов к таблицам жанров.'
+        )
+
+    def test_02_genre_list_follows_changes(self, admin_client,
+                                           genre_objects):
+        from reviews.models import GenreTitle, Title
+
+        drama, comedy, action = genre_objects
+        response = admin_client.post(self.url, data={
+            'name': 'Фильм', 'year': 2000, 'category': 'film',
+            'genre': ['drama'],
+        })
+        title = Title.objects.get(pk=response.json()['id'])
+        response = admin_client.patch(
+            f'{self.url}{title.id}/', data={'genre': ['comedy', 'action']}
+        )
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'action', 'comedy'
+        ]
+
+        link = GenreTitle.objects.create(title=title, genre=drama)
+        title.refresh_from_db()
+        assert title.genre_list == genres(title), (
+            'Проверьте, что `genre_list` обновляется при изменении строк '
+            '`GenreTitle` (например, из админки).'
+        )
+        link.delete()
+        drama.titles.add(title)
+        comedy.name = 'Трагикомедия'
+        comedy.save()
+        action.titles.clear()
+        title.refresh_from_db()
+        assert title.genre_list == genres(title) == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Трагикомедия', 'slug': 'comedy'},
+        ], (
+            'Проверьте, что `genre_list` обновляется при изменении жанров '
+            'с любой стороны связи и при переименовании жанра.'
+        )
+
+    def test_03_load_fills_genre_list(self):
+        from reviews.models import Title
+
+        call_command('load', path=DATA_PATH)
+        for title in Title.objects.prefetch_related('genre'):
+            assert title.genre_list == genres(title), (
+                'Проверьте, что команда `load` заполняет `genre_list`.'
+            )
+
+    def test_04_genre_delete_refreshes_titles_once(self, admin_client,
+                                                   genre_objects):
+        from reviews.models import Title
+
+        for number in range(3):
+            admin_client.post(self.url, data={
+                'name': f'Фильм {number}', 'year': 2000,
+                'category': 'film', 'genre': ['drama', 'comedy'],
+            })
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete('/api/v1/genres/drama/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        refreshes = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_genretitle"' in query['sql']
+            and '"reviews_genre"."name"' in query['sql']
+        ]
+        assert len(refreshes) == 1, (
+            'Проверьте, что при удалении жанра `genre_list` его '
+            'произведений пересобирается одним запросом, а не на каждую '
+            'связь.'
+        )
+        for title in Title.objects.prefetch_related('genre'):
+            assert title.genre_list == genres(title) == [
+                {'name': 'Комедия', 'slug': 'comedy'}
+            ]
+
+    def test_05_failed_genre_delete_keeps_link_handlers(self, admin_client,
+                                                        genre_objects):
+        from django.db import DatabaseError
+        from django.db.models.signals import pre_delete
+
+        from reviews.models import Genre, GenreTitle, Title
+
+        response = admin_client.post(self.url, data={
+            'name': 'Фильм', 'year': 2000, 'category': 'film',
+            'genre': ['drama', 'comedy'],
+        })
+        title = Title.objects.get(pk=response.json()['id'])
+
+        def fail(**kwargs):
+            raise DatabaseError('Удаление не удалось.')
+
+        pre_delete.connect(fail, sender=Genre)
+        try:
+            with pytest.raises(DatabaseError):
+                genre_objects[0].delete()
+        finally:
+            pre_delete.disconnect(fail, sender=Genre)
+        GenreTitle.objects.get(title=title, genre=genre_objects[0]).delete()
+        title.refresh_from_db()
+        assert title.genre_list == [{'name': 'Комедия', 'slug': 'comedy'}], (
+            'Проверьте, что неудачное удаление жанра не отключает '
+            'пересборку `genre_list` при удалении его связей.'
+        )
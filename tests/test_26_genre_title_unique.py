@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+
+def link_queries(context):
+    return [
+        query['sql'].split()[0] for query in context.captured_queries
+        if 'reviews_genretitle' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26GenreTitleUnique:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def title(self, admin_client):
+        from reviews.models import Category, Genre, Title
+
+        Category.objects.create(name='Фильм', slug='film')
+        for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'),
+                           ('Боевик', 'action'), ('Мюзикл', 'musical')):
+            Genre.objects.create(name=name, slug=slug)
+        response = admin_client.post(self.url, data={
+            'name': 'Фильм', 'year': 2000, 'category': 'film',
+            'genre': ['drama', 'comedy', 'drama'],
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        return Title.objects.get(pk=response.json()['id'])
+
+    def test_01_duplicate_link_is_rejected(self, title):
+        from reviews.models import Genre, GenreTitle
+
+        assert GenreTitle.objects.filter(title=title).count() == 2, (
+            'Проверьте, что повтор жанра в запросе не создаёт вторую связь.'
+        )
+        with pytest.raises(IntegrityError):
+            GenreTitle.objects.create(
+                title=title, genre=Genre.objects.get(slug='drama')
+            )
+
+    def test_02_patch_diffs_links(self, admin_client, title):
+        from reviews.models import GenreTitle
+
+        kept = GenreTitle.objects.get(title=title, genre__slug='comedy')
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                f'{self.url}{title.id}/',
+                data={'genre': ['comedy', 'action', 'musical']},
+            )
+        assert response.status_code == HTTPStatus.OK
+        queries = link_queries(context)
+        assert queries.count('DELETE') == queries.count('INSERT') == 1, (
+            'Проверьте, что при смене жанров лишние связи удаляются одним '
+            'запросом, а новые добавляются одним `bulk_create`.'
+        )
+        assert not [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_genretitle"' in query['sql']
+            and '"reviews_genre"."name"' in query['sql']
+        ], (
+            'Проверьте, что удаление связей не пересобирает `genre_list` '
+            'из базы.'
+        )
+        assert GenreTitle.objects.filter(pk=kept.pk).exists(), (
+            'Проверьте, что сохранившиеся связи не пересоздаются.'
+        )
+        expected = [
+            {'name': 'Боевик', 'slug': 'action'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+            {'name': 'Мюзикл', 'slug': 'musical'},
+        ]
+        assert response.json()['genre'] == expected
+        title.refresh_from_db()
+        assert title.genre_list == expected
+
+    def test_03_patch_without_genre_keeps_links(self, admin_client, title):
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                f'{self.url}{title.id}/', data={'name': 'Другой фильм'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert not link_queries(context)
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'drama', 'comedy'
+        ]
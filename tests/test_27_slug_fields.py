@@ -0,0 +1,147 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+GENRES = (
+    ('Драма', 'drama'), ('Комедия', 'comedy'), ('Боевик', 'action'),
+    ('Мюзикл', 'musical'), ('Триллер', 'thriller'),
+)
+
+
+def lookup_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if '"reviews_genre"' in query['sql']
+        or '"reviews_category"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27SlugFields:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def catalog(self):
+        from reviews.models import Category, Genre
+
+        Category.objects.create(name='Фильм', slug='film')
+        for name, slug in GENRES:
+            Genre.objects.create(name=name, slug=slug)
+
+    def post_title(self, client, genre):
+        return client.post(self.url, data={
+            'name': 'Фильм', 'year': 2000, 'category': 'film',
+            'genre': genre,
+        })
+
+    def test_01_genres_resolved_in_one_query(self, admin_client, catalog):
+        slugs = [slug for _, slug in GENRES]
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_title(admin_client, slugs)
+        assert response.status_code == HTTPStatus.CREATED
+        queries = lookup_queries(context)
+        assert len(queries) == 2, (
+            'Проверьте, что все slug жанров разрешаются одним запросом, '
+            'а категория — ещё одним.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_title(admin_client, slugs[:3])
+        assert response.status_code == HTTPStatus.CREATED
+        assert not lookup_queries(context), (
+            'Проверьте, что уже найденные жанры и категории берутся из '
+            'кэша процесса.'
+        )
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'action', 'drama', 'comedy'
+        ]
+
+    def test_02_unknown_slugs_reported_together(self, admin_client,
+                                                catalog):
+        from reviews.models import Title
+
+        response = self.post_title(
+            admin_client, ['drama', 'western', 'horror']
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = ' '.join(response.json()['genre'])
+        assert 'western' in errors and 'horror' in errors, (
+            'Проверьте, что в ответе перечислены все неизвестные slug.'
+        )
+        response = admin_client.post(self.url, data={
+            'name': 'Фильм', 'year': 2000, 'category': 'book',
+            'genre': ['drama'],
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'category' in response.json()
+        assert not Title.objects.exists()
+
+    def test_03_cache_follows_changes(self, admin_client, catalog):
+        from reviews.models import Genre
+
+        assert self.post_title(admin_client, ['drama']).status_code == (
+            HTTPStatus.CREATED
+        )
+        genre = Genre.objects.get(slug='drama')
+        genre.name = 'Мелодрама'
+        genre.save()
+        response = self.post_title(admin_client, ['drama'])
+        assert response.json()['genre'] == [
+            {'name': 'Мелодрама', 'slug': 'drama'}
+        ], (
+            'Проверьте, что изменение жанра сбрасывает кэш slug.'
+        )
+
+        genre.delete()
+        response = self.post_title(admin_client, ['drama'])
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что удалённый жанр больше не находится по slug.'
+        )
+
+    def test_04_changes_from_other_processes(self, admin_client, catalog,
+                                             monkeypatch, settings):
+        import time
+
+        from reviews.models import Title
+
+        assert self.post_title(admin_client, ['drama']).status_code == (
+            HTTPStatus.CREATED
+        )
+        # Изменения в другом процессе: сигналы этого процесса не
+        # срабатывают, версия в локальном кэше каталога прежняя.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE reviews_genre SET name = %s WHERE slug = %s',
+                ['Мелодрама', 'drama'],
+            )
+        expired = time.monotonic() + settings.SLUG_CACHE_TIMEOUT + 1
+        monkeypatch.setattr(time, 'monotonic', lambda: expired)
+        response = self.post_title(admin_client, ['drama'])
+        assert response.json()['genre'] == [
+            {'name': 'Мелодрама', 'slug': 'drama'}
+        ], (
+            'Проверьте, что найденные по slug объекты хранятся в памяти '
+            'процесса не дольше `SLUG_CACHE_TIMEOUT`.'
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM reviews_genretitle WHERE genre_id IN '
+                '(SELECT id FROM reviews_genre WHERE slug = %s)',
+                ['drama'],
+            )
+            cursor.execute(
+                'DELETE FROM reviews_genre WHERE slug = %s', ['drama']
+            )
+        titles = Title.objects.count()
+        response = self.post_title(admin_client, ['drama'])
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что ссылка на удалённый жанр из кэша полей '
+            'возвращает ошибку проверки, а не 500.'
+        )
+        assert Title.objects.count() == titles
+        response = self.post_title(admin_client, ['drama'])
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'drama' in ' '.join(response.json()['genre'])
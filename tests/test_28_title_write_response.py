@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def reads_after_write(context):
+    queries = [query['sql'] for query in context.captured_queries]
+    first_write = next(
+        index for index, sql in enumerate(queries)
+        if sql.startswith(('INSERT', 'UPDATE', 'DELETE'))
+    )
+    return [sql for sql in queries[first_write:] if sql.startswith('SELECT')]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TitleWriteResponse:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture
+    def catalog(self, admin_client):
+        from reviews.models import Category, Genre
+
+        Category.objects.create(name='Фильм', slug='film')
+        Category.objects.create(name='Книга', slug='book')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        admin_client.get('/api/v1/users/me/')
+
+    def test_01_create_response_without_reads(self, admin_client, catalog):
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.url, data={
+                'name': 'Фильм', 'year': 2000, 'category': 'film',
+                'genre': ['drama', 'comedy'],
+            })
+        assert response.status_code == HTTPStatus.CREATED
+        assert not reads_after_write(context), (
+            'Проверьте, что ответ на создание произведения собирается из '
+            'проверенных данных, без запросов к базе после записи.'
+        )
+        assert response.json() == {
+            'id': response.json()['id'],
+            'name': 'Фильм',
+            'year': 2000,
+            'rating': None,
+            'description': '',
+            'genre': [
+                {'name': 'Драма', 'slug': 'drama'},
+                {'name': 'Комедия', 'slug': 'comedy'},
+            ],
+            'category': {'name': 'Фильм', 'slug': 'film'},
+        }
+
+    def test_02_update_keeps_stored_rating(self, admin_client, user,
+                                           catalog):
+        from reviews.models import Review, Title
+
+        response = admin_client.post(self.url, data={
+            'name': 'Фильм', 'year': 2000, 'category': 'film',
+            'genre': ['drama'],
+        })
+        title = Title.objects.get(pk=response.json()['id'])
+        Review.objects.create(title=title, author=user, text='Да', score=7)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                f'{self.url}{title.id}/',
+                data={'category': 'book', 'genre': ['comedy']},
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['rating'] == 7
+        assert response.json()['category'] == {
+            'name': 'Книга', 'slug': 'book'
+        }
+        assert response.json()['genre'] == [
+            {'name': 'Комедия', 'slug': 'comedy'}
+        ]
+        assert not [
+            sql for sql in reads_after_write(context)
+            if 'reviews_genretitle' not in sql
+        ], (
+            'Проверьте, что ответ на изменение произведения не читает '
+            'базу после записи.'
+        )
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert len(updates) == 1 and 'score_sum' not in updates[0], (
+            'Проверьте, что изменение произведения сохраняет только '
+            'пришедшие поля и не перезаписывает счётчики рейтинга.'
+        )